@@ -0,0 +1,96 @@
+import glob
+import json
+import os
+import time
+import uuid
+
+DEFAULT_DIRECTORY = '.iso27001_sessions'
+
+
+class AnswerJournal:
+    """Append-only journal of guided answers for one session
+
+    Every answer is written as one JSON line and flushed to the OS
+    immediately, so an aborted session loses nothing. fsync is batched
+    (every fsync_every answers or fsync_interval seconds) to bound what a
+    power loss can cost without paying a disk sync per keystroke-sized
+    answer. Appends never rewrite earlier entries.
+    """
+
+    def __init__(self, path, fsync_every=8, fsync_interval=2.0):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        if os.path.exists(path):
+            # Cut a resumed journal back to the entries replay reads, ending in a
+            # newline, so new answers are not appended to a torn final line
+            with open(path, 'r+b') as f:
+                length = self._replayable_length(f)
+                f.truncate(length)
+                if length:
+                    f.seek(length - 1)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+        self.file = open(path, 'a', encoding='utf-8')
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    @classmethod
+    def create(cls, directory=DEFAULT_DIRECTORY, **kwargs):
+        """Start a journal for a new session"""
+        return cls(os.path.join(directory, f"{uuid.uuid4().hex}.jsonl"), **kwargs)
+
+    def append(self, title, answer):
+        self.file.write(json.dumps({'title': title, 'answer': answer}) + "\n")
+        self.file.flush()
+        self.pending += 1
+        if self.pending >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if self.pending:
+            os.fsync(self.file.fileno())
+            self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def discard(self):
+        """Close and remove the journal once its session has completed"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def _replayable_length(f):
+        """Byte length of the leading entries replay reads from a binary journal file"""
+        length = 0
+        for line in f:
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            length += len(line)
+        return length
+
+    @staticmethod
+    def replay(path):
+        """Read journal entries in order, ignoring a torn final line"""
+        entries = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+        return entries
+
+    @staticmethod
+    def unfinished(directory=DEFAULT_DIRECTORY):
+        """Journals of sessions that were interrupted, most recent first"""
+        paths = glob.glob(os.path.join(directory, '*.jsonl'))
+        return sorted(paths, key=os.path.getmtime, reverse=True)
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+from collections import ChainMap
+from collections.abc import Mapping
+
+EXTENDS_KEY = 'extends'
+
+
+class LayeredAnswers(ChainMap):
+    """Answer set that overlays its own answers on one or more parent layers
+
+    Lookups fall through the layers without copying them, so hundreds of
+    subsidiaries can share one parent's answers. Nested answers such as
+    risk_process merge key by key, so a subsidiary may override a single
+    field. Writes only touch the first (subsidiary) layer.
+    """
+
+    # Absolute path of the "extends" parent the layers below come from
+    parent_path = None
+
+    def __getitem__(self, key):
+        found = [layer[key] for layer in self.maps if key in layer]
+        if not found:
+            return self.__missing__(key)
+        if isinstance(found[0], Mapping):
+            nested = []
+            for value in found:
+                if not isinstance(value, Mapping):
+                    break
+                nested.append(value)
+            if len(nested) > 1:
+                return LayeredAnswers(*nested)
+        return found[0]
+
+    @property
+    def overrides(self):
+        """Answers set on this layer itself"""
+        return self.maps[0]
+
+
+def layer(answers, directory='.', parents=None):
+    """Wrap an answer dict, resolving its "extends" chain of parent files
+
+    extends paths are relative to directory. Parents are loaded once per
+    parents dict and shared by every answer set that extends them.
+    """
+    parents = {} if parents is None else parents
+    answers = dict(answers)
+    parent_path = answers.pop(EXTENDS_KEY, None)
+    if not parent_path:
+        return LayeredAnswers(answers)
+    parent_path = os.path.abspath(os.path.join(directory, parent_path))
+    parent = parents.get(parent_path)
+    if parent is None:
+        parent = parents[parent_path] = load_layered(parent_path, parents)
+    layered = LayeredAnswers(answers, *parent.maps)
+    layered.parent_path = parent_path
+    return layered
+
+
+def load_layered(path, parents=None):
+    """Load a JSON answer file with its parent layers"""
+    with open(path) as f:
+        answers = json.load(f)
+    return layer(answers, os.path.dirname(os.path.abspath(path)), parents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how a layered answer file resolves against its parents")
+    parser.add_argument('path', help="JSON answer file, optionally with \"extends\": \"parent.json\"")
+    args = parser.parse_args()
+
+    answers = load_layered(args.path)
+    print(f"{len(answers.maps)} layer(s), {len(answers.overrides)} overridden answer(s)")
+    for key in sorted(answers):
+        value = answers[key]
+        if isinstance(value, Mapping):
+            value = dict(value)
+        source = "override" if key in answers.overrides else "inherited"
+        print(f"{key:<24} {source:<10} {json.dumps(value)[:60]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+
+from ControlCatalog import THEMES
+
+DEFAULT_CYCLE_YEARS = 3
+PERIODS_PER_YEAR = 4
+
+# Scope inclusions of the 4.3 template and the unit type each becomes
+SCOPE_TYPES = (('processes', "Process"), ('locations', "Location"), ('technologies', "Technology"))
+
+
+class AuditUnit:
+    """Something that must be audited: a process, location, technology or Annex A theme"""
+    __slots__ = ('name', 'unit_type', 'department', 'days', 'audits_per_cycle')
+
+    def __init__(self, name, unit_type, department=None, days=1, audits_per_cycle=1):
+        self.name = name
+        self.unit_type = unit_type
+        self.department = department
+        self.days = days
+        self.audits_per_cycle = audits_per_cycle
+
+
+class Auditor:
+    __slots__ = ('name', 'department', 'days_per_period', 'unavailable')
+
+    def __init__(self, name, department=None, days_per_period=10, unavailable=()):
+        self.name = name
+        self.department = department
+        self.days_per_period = days_per_period
+        self.unavailable = frozenset(unavailable)
+
+
+class Assignment:
+    __slots__ = ('period', 'unit', 'auditor')
+
+    def __init__(self, period, unit, auditor):
+        self.period = period
+        self.unit = unit
+        self.auditor = auditor
+
+
+def _unit(entry, unit_type):
+    if isinstance(entry, str):
+        return AuditUnit(entry, unit_type)
+    return AuditUnit(entry['name'], unit_type, entry.get('department'), entry.get('days', 1),
+                     entry.get('audits_per_cycle', 1))
+
+
+class AuditPlanner:
+    """Greedy scheduler of an internal audit cycle
+
+    Every unit is audited audits_per_cycle times, each occurrence inside its
+    own slice of the cycle. Occurrences with the fewest eligible auditors
+    are placed first; each goes to the least loaded period of its slice and
+    the independent auditor (not from the unit's department) with the most
+    capacity left there. Eligible auditors are computed once per department,
+    so thousands of units cost O(occurrences x periods x auditors) at worst.
+    """
+
+    def __init__(self, units, auditors, start_year, cycle_years=DEFAULT_CYCLE_YEARS,
+                 periods_per_year=PERIODS_PER_YEAR):
+        self.units = units
+        self.auditors = auditors
+        self.periods = [
+            f"{year}-Q{quarter}" if periods_per_year == 4 else f"{year}-P{quarter}"
+            for year in range(start_year, start_year + cycle_years)
+            for quarter in range(1, periods_per_year + 1)
+        ]
+        self.assignments = []
+        self.unplaced = []
+
+    @classmethod
+    def from_config(cls, config):
+        """Build units from scope inclusions and Annex A themes, plus the auditor pool"""
+        units = [
+            _unit(entry, unit_type)
+            for key, unit_type in SCOPE_TYPES
+            for entry in config.get(key, ())
+        ]
+        if config.get('themes', True):
+            units.extend(AuditUnit(f"Annex A {theme} controls", "Annex A theme", days=2)
+                         for theme in THEMES.values())
+        units.extend(_unit(entry, entry.get('type', "Other")) for entry in config.get('units', ()))
+        auditors = [Auditor(**entry) for entry in config['auditors']]
+        return cls(units, auditors, config['start_year'], config.get('cycle_years', DEFAULT_CYCLE_YEARS),
+                   config.get('periods_per_year', PERIODS_PER_YEAR))
+
+    def _eligible(self, department, cache):
+        if department not in cache:
+            cache[department] = [auditor for auditor in self.auditors
+                                 if department is None or auditor.department != department]
+        return cache[department]
+
+    def plan(self):
+        """Schedule every audit occurrence; returns (assignments, unplaced occurrences)"""
+        period_count = len(self.periods)
+        capacity = {
+            auditor.name: [0 if period in auditor.unavailable else auditor.days_per_period
+                           for period in self.periods]
+            for auditor in self.auditors
+        }
+        load = [0] * period_count
+        eligible_cache = {}
+
+        occurrences = []
+        for unit in self.units:
+            eligible = self._eligible(unit.department, eligible_cache)
+            count = max(1, min(unit.audits_per_cycle, period_count))
+            for occurrence in range(count):
+                window = range(occurrence * period_count // count, (occurrence + 1) * period_count // count)
+                occurrences.append((len(eligible), len(window), -unit.days, unit.name, unit, window, eligible))
+        occurrences.sort(key=lambda entry: entry[:4])
+
+        self.assignments = []
+        self.unplaced = []
+        for _, _, _, _, unit, window, eligible in occurrences:
+            placed = False
+            for period in sorted(window, key=load.__getitem__):
+                best = None
+                best_capacity = unit.days - 1
+                for auditor in eligible:
+                    remaining = capacity[auditor.name][period]
+                    if remaining > best_capacity:
+                        best, best_capacity = auditor, remaining
+                if best is not None:
+                    capacity[best.name][period] -= unit.days
+                    load[period] += unit.days
+                    self.assignments.append(Assignment(period, unit, best))
+                    placed = True
+                    break
+            if not placed:
+                reason = "no independent auditor" if not eligible else "no auditor capacity in its window"
+                self.unplaced.append((unit, window, reason))
+        self.assignments.sort(key=lambda assignment: (assignment.period, assignment.unit.unit_type,
+                                                      assignment.unit.name))
+        return self.assignments, self.unplaced
+
+    def program_rows(self):
+        """Yield the audit program table lines"""
+        name_width = max([10] + [len(a.unit.name) for a in self.assignments])
+        auditor_width = max([7] + [len(a.auditor.name) for a in self.assignments])
+        yield f"| Period  | {'Audit Unit':<{name_width}} | Type          | {'Auditor':<{auditor_width}} | Days |"
+        yield f"|---------|{'-' * (name_width + 2)}|---------------|{'-' * (auditor_width + 2)}|------|"
+        for assignment in self.assignments:
+            yield (f"| {self.periods[assignment.period]:<7} | {assignment.unit.name:<{name_width}} | "
+                   f"{assignment.unit.unit_type:<13} | {assignment.auditor.name:<{auditor_width}} | "
+                   f"{assignment.unit.days:>4} |")
+
+    def summary(self):
+        """Yield coverage and auditor utilisation lines"""
+        scheduled = {id(a.unit) for a in self.assignments}
+        yield (f"Audit cycle {self.periods[0]} to {self.periods[-1]}: {len(self.assignments)} audits of "
+               f"{len(scheduled)}/{len(self.units)} units scheduled, {len(self.unplaced)} unplaced")
+        days = {}
+        for assignment in self.assignments:
+            days[assignment.auditor.name] = days.get(assignment.auditor.name, 0) + assignment.unit.days
+        for auditor in self.auditors:
+            available = sum(auditor.days_per_period for period in self.periods if period not in auditor.unavailable)
+            used = days.get(auditor.name, 0)
+            yield f"  {auditor.name}: {used}/{available} audit days ({used / available if available else 0:.0%})"
+        for unit, window, reason in self.unplaced:
+            yield (f"  UNPLACED {unit.unit_type} {unit.name} "
+                   f"({self.periods[window[0]]}..{self.periods[window[-1]]}): {reason}")
+
+    def audit_program(self):
+        """Text for the 9.2 Audit Program field"""
+        return "\n".join([*self.summary(), "", *self.program_rows()])
+
+    def template_values(self):
+        return {'audit_program': self.audit_program()}
+
+
+def load_plan(config):
+    """Plan an audit cycle from a config dict or a JSON file path"""
+    if isinstance(config, str):
+        with open(config) as f:
+            config = json.load(f)
+    planner = AuditPlanner.from_config(config)
+    planner.plan()
+    return planner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan the internal audit program over an audit cycle")
+    parser.add_argument('config', help="JSON with start_year, processes, locations, technologies and auditors")
+    args = parser.parse_args()
+
+    planner = load_plan(args.config)
+    print(planner.audit_program())
+
+
+if __name__ == "__main__":
+    main()
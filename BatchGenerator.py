@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from AnswerLayers import EXTENDS_KEY, LayeredAnswers, layer
+from ContentStore import ContentStore
+from DocIdAllocator import DocIdAllocator
+from DocumentCatalog import DocumentCatalog
+from ISO27001DocsGenerator import SECTION_PLANS, ComprehensiveISO27001Generator, write_documentation
+from Profiler import PhaseProfiler, write_chrome_trace
+from RiskEngine import load_register
+from ReferenceChecker import check_references
+from SearchIndex import SearchIndex
+from SectionCache import MemorySectionCache, SectionCache
+
+# With share_sections, sections rendered in this worker process are reused
+# by later packs whose section inputs resolve to the same values (e.g.
+# subsidiaries of one parent)
+SHARED_SECTIONS = MemorySectionCache()
+
+# Parent answer sets loaded by this worker process; tasks only carry a
+# subsidiary's own answers and the path of its parent
+WORKER_PARENTS = {}
+
+# Errors of one unreadable answer set: bad JSON, a non-object line or a
+# missing or malformed extends parent
+LOAD_ERRORS = (OSError, ValueError, TypeError)
+
+
+def load_answer_sets(path, failures=None):
+    """Yield (organization, answers) from a JSONL file or a directory of JSON files
+
+    An answer set with "extends": "parent.json" is layered over that parent,
+    which is loaded once and shared by all of its subsidiaries. With a
+    failures list, answer sets that are not valid JSON or whose parent
+    cannot be loaded are appended to it as (organization, error) and
+    skipped; without one, the error is raised.
+    """
+    parents = {}
+    if os.path.isdir(path):
+        for entry in sorted(os.listdir(path)):
+            if not entry.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(path, entry)) as f:
+                    answers = layer(json.load(f), path, parents)
+            except LOAD_ERRORS as error:
+                if failures is None:
+                    raise
+                failures.append((os.path.splitext(entry)[0], f"{entry}: {type(error).__name__}: {error}"))
+                continue
+            yield answers.overrides.get('organization') or os.path.splitext(entry)[0], answers
+    else:
+        directory = os.path.dirname(os.path.abspath(path))
+        with open(path) as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    answers = layer(json.loads(line), directory, parents)
+                except LOAD_ERRORS as error:
+                    if failures is None:
+                        raise
+                    failures.append((f"organization_{line_no}", f"line {line_no}: {type(error).__name__}: {error}"))
+                    continue
+                yield answers.overrides.get('organization') or f"organization_{line_no}", answers
+
+
+def output_filename(organization, output_dir):
+    """Build the pack filename for an organization"""
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', organization).strip('_') or 'organization'
+    return os.path.join(output_dir, f"ISO27001_Mandatory_Documentation_{safe_name}.txt")
+
+
+def render_pack(organization, answers, output_dir, cache_dir=None, profile=False, store_dir=None,
+                doc_id=None, share_sections=False):
+    """Render and save one organization's pack without prompting
+
+    With store_dir, the pack goes into that content store under the
+    organization's label and the returned filename is 'stored <hash>' or
+    'unchanged <hash>' instead of a path. doc_id overrides the pack's
+    Document ID. Without cache_dir, share_sections reuses sections rendered
+    for earlier packs in this worker process.
+    """
+    start = time.perf_counter()
+    profiler = PhaseProfiler(label=organization) if profile else None
+    generator = ComprehensiveISO27001Generator(profiler=profiler)
+    if cache_dir:
+        cache = SectionCache(cache_dir)
+    else:
+        cache = SHARED_SECTIONS if share_sections else None
+    misses = cache.misses if cache else 0
+    # Writes go to a fresh top layer, so layered answers are read in place
+    # rather than flattened into a copy
+    records = LayeredAnswers({}, *getattr(answers, 'maps', (answers,)))
+    if records.get('risk_register'):
+        # Parsed once for both the SoA and the risk treatment tables
+        with generator._phase('risk_register'):
+            records['risk_register'] = load_register(records['risk_register'])
+    if not records.get('soa'):
+        with generator._phase('soa'):
+            records['soa'] = generator.generate_soa(
+                records.get('soa_controls'), records.get('risk_register'), records.get('evidence_index')
+            )
+    if doc_id:
+        records['doc_id'] = doc_id
+    with generator._phase('write'):
+        if store_dir:
+            pack, changed = ContentStore(store_dir).put_pack(generator.iter_sections(records, cache), organization)
+            filename = f"{'stored' if changed else 'unchanged'} {pack[:12]}"
+        else:
+            filename = write_documentation(
+                output_filename(organization, output_dir),
+                generator.iter_mandatory_documentation(records, cache),
+            )
+    rerendered = cache.misses - misses if cache else len(SECTION_PLANS)
+    events = profiler.events if profiler else None
+    return organization, filename, time.perf_counter() - start, rerendered, events
+
+
+class PackFailed(Exception):
+    """An answer set whose pack could not be rendered, with the time spent on it"""
+
+    def __init__(self, message, elapsed):
+        super().__init__(message, elapsed)
+        self.message = message
+        self.elapsed = elapsed
+
+
+def _render_task(organization, overrides, parent_path, *args):
+    start = time.perf_counter()
+    try:
+        if parent_path:
+            answers = layer({**overrides, EXTENDS_KEY: parent_path}, parents=WORKER_PARENTS)
+        else:
+            answers = LayeredAnswers(overrides)
+        return render_pack(organization, answers, *args)
+    except Exception as error:
+        raise PackFailed(f"{type(error).__name__}: {error}", time.perf_counter() - start) from None
+
+
+def run_batch(answers_path, output_dir, workers=None, cache_dir=None, profile=None, store_dir=None,
+              id_database=None, share_sections=False):
+    """Render every answer set across a process pool and report timings
+
+    With profile set to a path prefix, per-phase and per-section timings of
+    every worker are written to <profile>.json and <profile>.trace.json.
+    With store_dir, packs go into that content store instead of output_dir.
+    With id_database, packs without a doc_id answer get sequential
+    ISMS-YY-NN IDs: the main process leases them in blocks and hands one to
+    each task, committing it when the pack is written and returning the
+    IDs of failed or unsubmitted packs, so workers never contend for IDs.
+    An answer set that cannot be loaded or rendered is reported and
+    skipped. Returns (results, failures), with failures as (organization,
+    error, seconds) tuples.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    results = []
+    failures = []
+    events = []
+    allocator = DocIdAllocator(id_database, block_size=64) if id_database else None
+    doc_ids = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            unreadable = []
+            for organization, answers in load_answer_sets(answers_path, unreadable):
+                doc_id = allocator.allocate('ISMS') if allocator and not answers.get('doc_id') else None
+                # Workers load each parent once, so only the subsidiary's own answers are pickled
+                future = pool.submit(_render_task, organization, answers.overrides, answers.parent_path,
+                                     output_dir, cache_dir, bool(profile), store_dir, doc_id, share_sections)
+                doc_ids[future] = doc_id
+                futures[future] = organization
+            for organization, message in unreadable:
+                failures.append((organization, message, 0.0))
+                print(f"{organization}: FAILED to load: {message}")
+            for future in as_completed(futures):
+                doc_id = doc_ids.pop(future)
+                try:
+                    organization, filename, elapsed, rerendered, pack_events = future.result()
+                except PackFailed as failure:
+                    if doc_id:
+                        allocator.release(doc_id)
+                    failures.append((futures[future], failure.message, failure.elapsed))
+                    print(f"{futures[future]}: FAILED after {failure.elapsed * 1000:.1f} ms: {failure.message}")
+                    continue
+                except BaseException:
+                    if doc_id:
+                        allocator.release(doc_id)
+                    raise
+                if doc_id:
+                    allocator.commit(doc_id)
+                results.append((organization, filename, elapsed))
+                events.extend(pack_events or ())
+                print(f"{organization}: {elapsed * 1000:.1f} ms, "
+                      f"{rerendered}/{len(SECTION_PLANS)} sections rendered -> {filename}")
+    finally:
+        if allocator:
+            # The pool has finished every submitted pack by now; packs that
+            # were written keep their IDs, the rest go back to the pool
+            written = [doc_id for future, doc_id in doc_ids.items()
+                       if doc_id and future.done() and not future.cancelled() and future.exception() is None]
+            if written:
+                allocator.commit(*written)
+            allocator.close()
+
+    total = time.perf_counter() - start
+    throughput = len(results) / total if total else 0.0
+    print(f"\nGenerated {len(results)} packs in {total:.2f} s ({throughput:.1f} packs/s)"
+          + (f", {len(failures)} failed" if failures else ""))
+    if cache_dir:
+        removed, freed = SectionCache(cache_dir).prune()
+        if removed:
+            print(f"Pruned {removed} stale cached sections ({freed / 1024:,.1f} KB) from {cache_dir}")
+    if profile:
+        with open(f"{profile}.json", 'w') as f:
+            json.dump({'events': events}, f, indent=2)
+        write_chrome_trace(f"{profile}.trace.json", events)
+        print(f"Profile written to {profile}.json and {profile}.trace.json")
+    return results, failures
+
+
+def catalog_results(results, database):
+    """Bulk insert the generated packs into the document catalog"""
+    catalog = DocumentCatalog(database)
+    try:
+        count = catalog.add_files(filename for _, filename, _ in results)
+    finally:
+        catalog.close()
+    print(f"Catalogued {count} packs in {database}")
+
+
+def index_results(results, path):
+    """Add the generated packs to the full-text search index"""
+    index = SearchIndex(path)
+    try:
+        count = index.add_files(filename for _, filename, _ in results)
+    finally:
+        index.close()
+    print(f"Indexed {count} packs in {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate ISO 27001:2022 documentation packs for many organizations without prompts"
+    )
+    parser.add_argument('answers', help="JSONL file or directory of JSON answer files")
+    parser.add_argument('-o', '--output-dir', default='.', help="Directory for generated packs")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Reuse rendered sections whose inputs are unchanged since the last run")
+    parser.add_argument('--share-sections', action='store_true',
+                        help="Reuse sections rendered for earlier packs in the same worker (e.g. subsidiaries)")
+    parser.add_argument('--catalog', default=None, metavar='DATABASE',
+                        help="Record generated packs in this SQLite document catalog")
+    parser.add_argument('--index', default=None, metavar='DATABASE',
+                        help="Add generated packs to this full-text search index")
+    parser.add_argument('--profile', default=None, metavar='PREFIX',
+                        help="Record per-phase and per-section timings to PREFIX.json and PREFIX.trace.json")
+    parser.add_argument('--store', default=None, metavar='DIRECTORY',
+                        help="Keep packs in this content-addressed store instead of writing files")
+    parser.add_argument('--id-database', default=None, metavar='DATABASE',
+                        help="Allocate sequential ISMS-YY-NN document IDs from this database")
+    parser.add_argument('--check-references', action='store_true',
+                        help="Check cross-document references of the generated packs; exit 1 on errors")
+    args = parser.parse_args()
+    if args.store and (args.catalog or args.index or args.check_references):
+        parser.error("--catalog, --index and --check-references need pack files "
+                     "and cannot be combined with --store")
+    results, failures = run_batch(args.answers, args.output_dir, args.workers, args.cache_dir, args.profile,
+                                  args.store, args.id_database, args.share_sections)
+    if args.catalog:
+        catalog_results(results, args.catalog)
+    if args.index:
+        index_results(results, args.index)
+    errors = check_references([filename for _, filename, _ in results]) if args.check_references else 0
+    if failures or errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
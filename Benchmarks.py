@@ -0,0 +1,229 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from string import Template
+
+from ISO27001DocsGenerator import BASE_TEMPLATE, RENDER_PLAN, ComprehensiveISO27001Generator, write_documentation
+from RiskEngine import RiskRegister
+
+ORGANIZATION_SCALES = (1, 100, 10000)
+RISK_SCALES = (100, 10000, 1000000)
+QUICK_ORGANIZATION_SCALES = (1, 100)
+QUICK_RISK_SCALES = (100, 10000)
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.25
+
+
+def synthetic_records(index=0):
+    """Build a representative answer set for benchmarking"""
+    return {
+        'scope': f"All business processes of business unit {index} including cloud services",
+        'risk_process': {
+            'methodology': "5x5 risk matrix with defined criteria",
+            'criteria': "Risks scored below 10 may be accepted",
+            'process': "Quarterly reviews with stakeholders",
+        },
+        'policy': "The organization is committed to protecting information assets",
+        'objectives': "Achieve 99.9% system availability",
+        'competence': "Annual security awareness training for all staff",
+        'operational_controls': "Change management with security review",
+        'monitoring': "Monthly KPI collection, quarterly reporting",
+        'audit': "Three-year audit cycle by independent auditors",
+        'management_review': "Twice yearly, chaired by the CEO",
+        'corrective_actions': "Logged, root cause analysed, effectiveness reviewed",
+        'owner': f"ISMS Manager {index}",
+    }
+
+
+def synthetic_register(rows, seed=27001):
+    """Build a risk register with random likelihood and impact scores"""
+    generator = random.Random(seed)
+    likelihood = bytes(generator.choices(range(1, 6), k=rows))
+    impact = bytes(generator.choices(range(1, 6), k=rows))
+    return RiskRegister([f"R{index}" for index in range(rows)], likelihood, impact)
+
+
+def measure(label, func, iterations):
+    """Run func repeatedly and print renders per second"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    rate = iterations / elapsed if elapsed else float('inf')
+    print(f"{label:<28} {iterations:>8} renders in {elapsed:.3f} s ({rate:,.0f} renders/s)")
+    return rate
+
+
+def bench_render(iterations):
+    """Compare string.Template.substitute with the precompiled render plan"""
+    values = ComprehensiveISO27001Generator().template_values(synthetic_records())
+    if Template(BASE_TEMPLATE).substitute(values) != RENDER_PLAN.render(values):
+        raise AssertionError("Render plan output differs from string.Template")
+
+    template_rate = measure("string.Template.substitute", lambda: Template(BASE_TEMPLATE).substitute(values), iterations)
+    plan_rate = measure("RenderPlan.render", lambda: RENDER_PLAN.render(values), iterations)
+    print(f"Speedup: {plan_rate / template_rate:.1f}x")
+
+
+def timed(units, func, min_time=0.2, max_runs=1000):
+    """Time func over repeated runs and return a result entry for the best run
+
+    Small scale points repeat until min_time has elapsed so that their
+    timings are stable enough to compare against a baseline.
+    """
+    best = float('inf')
+    total = 0.0
+    runs = 0
+    while runs < max_runs and (runs == 0 or total < min_time):
+        # Like timeit, keep garbage collection out of the measurement
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return {'units': units, 'runs': runs, 'seconds': best, 'rate': units / best if best else float('inf')}
+
+
+def bench_template_render(organizations):
+    values = ComprehensiveISO27001Generator().template_values(synthetic_records())
+    return timed(organizations, lambda: [RENDER_PLAN.render(values) for _ in range(organizations)])
+
+
+def bench_generate_soa(organizations):
+    generator = ComprehensiveISO27001Generator()
+    return timed(organizations, lambda: [generator.generate_soa() for _ in range(organizations)])
+
+
+def bench_compile(organizations):
+    generator = ComprehensiveISO27001Generator()
+    answer_sets = [synthetic_records(index) for index in range(organizations)]
+    soa = generator.generate_soa()
+    for records in answer_sets:
+        records['soa'] = soa
+    return timed(organizations, lambda: [generator.compile_mandatory_documentation(records) for records in answer_sets])
+
+
+def bench_file_write(organizations):
+    generator = ComprehensiveISO27001Generator()
+    records = synthetic_records()
+    records['soa'] = generator.generate_soa()
+    with tempfile.TemporaryDirectory() as directory:
+        def write_all():
+            for index in range(organizations):
+                filename = os.path.join(directory, f"ISO27001_Mandatory_Documentation_{index}.txt")
+                write_documentation(filename, generator.iter_mandatory_documentation(records))
+        return timed(organizations, write_all)
+
+
+def bench_risk_scoring(rows):
+    source = synthetic_register(rows)
+
+    def score_and_rank():
+        # A fresh register per run, so nothing memoized carries over
+        register = RiskRegister(source.risk_ids, source.likelihood, source.impact)
+        register.levels
+        register.decisions
+        register.order
+    return timed(rows, score_and_rank)
+
+
+def run_suite(quick=False):
+    """Run every benchmark at each scale point and return the results"""
+    organization_scales = QUICK_ORGANIZATION_SCALES if quick else ORGANIZATION_SCALES
+    risk_scales = QUICK_RISK_SCALES if quick else RISK_SCALES
+    benchmarks = [
+        ('template_render', bench_template_render, organization_scales),
+        ('generate_soa', bench_generate_soa, organization_scales),
+        ('compile_mandatory_documentation', bench_compile, organization_scales),
+        ('file_write', bench_file_write, organization_scales),
+        ('risk_scoring', bench_risk_scoring, risk_scales),
+    ]
+    results = {}
+    for name, bench, scales in benchmarks:
+        for scale in scales:
+            key = f"{name}[{scale}]"
+            results[key] = bench(scale)
+            print(f"{key:<42} {results[key]['seconds']:>9.4f} s {results[key]['rate']:>14,.0f} /s")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return regressions where throughput fell more than tolerance below baseline"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference and result['rate'] < reference['rate'] * (1 - tolerance):
+            regressions.append((key, reference['rate'], result['rate']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ISO 27001 documentation generation")
+    parser.add_argument('-n', '--iterations', type=int, default=None,
+                        help="Only compare string.Template with the render plan for N renders")
+    parser.add_argument('--quick', action='store_true', help="Skip the largest scale points")
+    parser.add_argument('-o', '--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', default=None,
+                        help=f"Baseline results JSON to compare against (default: {DEFAULT_BASELINE}); "
+                             "fails if a given baseline does not exist")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional throughput drop before failing (default: 0.25)")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the new baseline")
+    args = parser.parse_args()
+
+    if args.iterations:
+        bench_render(args.iterations)
+        return
+
+    results = run_suite(args.quick)
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.update_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline stored in {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print(f"\nNo baseline at {baseline_path}; run with --update-baseline to store one")
+        # Only the default baseline may be missing; a named one is a CI misconfiguration
+        if args.baseline:
+            sys.exit(1)
+        return
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} tolerance:")
+        for key, reference, current in regressions:
+            print(f"  {key}: {reference:,.0f} /s -> {current:,.0f} /s")
+        sys.exit(1)
+    print(f"\nNo regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
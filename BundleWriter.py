@@ -0,0 +1,213 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from ControlCatalog import CATALOG
+from CoverageMatrix import CoverageMatrix
+from DocIdAllocator import DocIdAllocator
+from EvidenceIndex import load_soa_evidence
+from ISO27001DocsGenerator import (
+    DOC_TITLE, ComprehensiveISO27001Generator, default_doc_id, measure_objectives, write_documentation,
+)
+from ObjectiveMonitor import ObjectiveMonitor
+from RiskEngine import load_register
+from TableEngine import load_templates
+
+# Controlled documents of the bundle, as keyed in DocTemplates.py, plus the
+# consolidated mandatory documentation pack
+DOCUMENT_KEYS = ('CTX', 'IPA', 'SCOPE', 'LCD', 'ISP', 'RA', 'OBJ', 'SOA')
+PACK_KEY = 'ISMS'
+MANIFEST_NAME = 'manifest.json'
+
+# Header lines of the templates that carry a date
+DATE_FIELDS = ('Last Review Date', 'Last Review', 'Assessment Date')
+
+
+def document_fields(key, answers):
+    """Header field values of one document; answers override the defaults"""
+    today = datetime.now()
+    fields = {
+        'Document ID': f"{key}-{today.strftime('%y')}-01",
+        'Version': "1.0",
+        'Period': today.strftime('%Y'),
+    }
+    for label in DATE_FIELDS:
+        fields[label] = today.strftime('%Y-%m-%d')
+    fields.update(answers.get('documents', {}).get(key, {}).get('fields', {}))
+    return fields
+
+
+def document_tables(key, template, answers):
+    """Record sources for a document's tables
+
+    answers['documents'][KEY]['tables'] maps table names to a CSV path or a
+    list of records. The risk register fills the RA tables, objective
+    measurements the OBJ tables, the control catalog the SoA and an evidence
+    index its CONTROL DETAILS when no explicit source is given.
+    """
+    tables = {}
+    if key == 'RA' and answers.get('risk_register'):
+        register = load_register(answers['risk_register'])
+        tables['RISK IDENTIFICATION'] = register.identification_records()
+        tables['RISK ANALYSIS'] = register.analysis_records()
+        tables['RISK EVALUATION'] = register.evaluation_records()
+        tables['RISK TREATMENT'] = register.treatment_records()
+    elif key == 'OBJ' and answers.get('objective_definitions'):
+        if answers.get('measurements'):
+            monitor = measure_objectives(answers)
+        else:
+            monitor = ObjectiveMonitor(answers['objective_definitions'])
+        tables['OBJECTIVE DEFINITION'] = list(monitor.definition_records())
+        tables['MONITORING AND REPORTING'] = list(monitor.monitoring_records())
+    elif key == 'SOA':
+        decisions = answers.get('soa_controls') or {}
+        if answers.get('risk_register'):
+            decisions = CoverageMatrix(load_register(answers['risk_register'])).soa_decisions(decisions)
+        # Lists rather than generators so the table is sized to the control names
+        tables['CONTROL IMPLEMENTATION'] = list(CATALOG.soa_records(decisions))
+        tables['EXCLUSIONS'] = [
+            (control_id, justification, "[Assessment]", "[Approver]")
+            for control_id, _, applicable, justification, _ in CATALOG.soa_records(decisions)
+            if applicable == "No"
+        ] or None
+        if answers.get('evidence_index'):
+            evidence = load_soa_evidence(answers['evidence_index'])
+            tables['CONTROL DETAILS'] = [
+                (control_id, "[Method]", evidence[control_id], "[Name]", "[Date]")
+                for control_id, _, _, _, _ in CATALOG.soa_records(decisions)
+                if control_id in evidence
+            ] or None
+
+    for name, source in answers.get('documents', {}).get(key, {}).get('tables', {}).items():
+        if isinstance(source, str):
+            tables[name] = template.tables[name].csv_records(source)
+        else:
+            tables[name] = source
+    return {name: records for name, records in tables.items() if records is not None}
+
+
+def _hashed(chunks, digest):
+    for chunk in chunks:
+        digest.update(chunk.encode('utf-8'))
+        yield chunk
+
+
+def render_document(key, answers, directory, doc_id=None):
+    """Render one document to a file in directory and describe it for the manifest"""
+    start = time.perf_counter()
+    digest = hashlib.sha256()
+    if key == PACK_KEY:
+        generator = ComprehensiveISO27001Generator()
+        records = dict(answers)
+        if doc_id:
+            records['doc_id'] = doc_id
+        if records.get('risk_register'):
+            records['risk_register'] = load_register(records['risk_register'])
+        if not records.get('soa'):
+            records['soa'] = generator.generate_soa(
+                records.get('soa_controls'), records.get('risk_register'), records.get('evidence_index')
+            )
+        doc_id, title = records.get('doc_id') or default_doc_id(), records.get('doc_title') or DOC_TITLE
+        chunks = generator.iter_mandatory_documentation(records)
+    else:
+        template = load_templates()[key]
+        fields = document_fields(key, answers)
+        if doc_id:
+            fields['Document ID'] = doc_id
+        doc_id, title = fields['Document ID'], template.title
+        chunks = template.render(document_tables(key, template, answers), fields)
+
+    path = write_documentation(os.path.join(directory, f"{key}.txt"), _hashed(chunks, digest))
+    return {
+        'key': key,
+        'doc_id': doc_id,
+        'title': title,
+        'file': f"{doc_id}.txt",
+        'path': path,
+        'sha256': digest.hexdigest(),
+        'bytes': os.path.getsize(path),
+        'render_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def write_bundle(answers, output, workers=None, executor='process', keys=DOCUMENT_KEYS + (PACK_KEY,),
+                 id_database=None):
+    """Render documents in parallel and stream them into a zip archive
+
+    Each document renders to its own temporary file on a worker; the main
+    process adds every file to the archive as soon as its worker finishes,
+    then writes a manifest with checksums last. With id_database, every
+    document gets the next ID of its type, committed once the archive is
+    complete. Returns the manifest.
+
+    On a thread pool the risk register is parsed once here and shared by
+    the RA, SoA and pack renders; process workers each parse it themselves
+    in parallel rather than receive a pickled copy.
+    """
+    pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    start = time.perf_counter()
+    if executor == 'thread' and answers.get('risk_register'):
+        answers = dict(answers, risk_register=load_register(answers['risk_register']))
+    allocator = DocIdAllocator(id_database, block_size=1) if id_database else None
+    doc_ids = {key: allocator.allocate(key) for key in keys} if allocator else {}
+    directory = tempfile.mkdtemp(prefix='.bundle-', dir=os.path.dirname(os.path.abspath(output)))
+    entries = {}
+    try:
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive, \
+                pool_class(max_workers=workers) as pool:
+            futures = [pool.submit(render_document, key, answers, directory, doc_ids.get(key)) for key in keys]
+            for future in as_completed(futures):
+                entry = future.result()
+                path = entry.pop('path')
+                archive.write(path, entry['file'])
+                os.remove(path)
+                entries[entry['key']] = entry
+                print(f"{entry['file']}: {entry['render_ms']:.1f} ms, {entry['bytes']:,} bytes")
+
+            manifest = {
+                'organization': answers.get('organization'),
+                'generated': datetime.now().isoformat(timespec='seconds'),
+                'documents': [entries[key] for key in keys],
+            }
+            archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+        if allocator:
+            allocator.commit(*doc_ids.values())
+            doc_ids = {}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        if allocator:
+            if doc_ids:
+                allocator.release(*doc_ids.values())
+            allocator.close()
+
+    print(f"\nBundled {len(entries)} documents into {output} in {time.perf_counter() - start:.2f} s")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render the ISO 27001 controlled documents in parallel into one zip bundle"
+    )
+    parser.add_argument('answers', help="JSON answer file (same format as BatchGenerator.py)")
+    parser.add_argument('-o', '--output', default='ISO27001_Document_Bundle.zip', help="Zip archive to write")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Workers (default: number of CPUs)")
+    parser.add_argument('--executor', choices=('process', 'thread'), default='process',
+                        help="Render on a process pool (default) or a thread pool")
+    parser.add_argument('--id-database', default=None, metavar='DATABASE',
+                        help="Allocate sequential document IDs (e.g. RA-26-07) from this database")
+    args = parser.parse_args()
+
+    with open(args.answers) as f:
+        answers = json.load(f)
+    write_bundle(answers, args.output, args.workers, args.executor, id_database=args.id_database)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import codecs
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import zlib
+from datetime import datetime
+
+from ISO27001DocsGenerator import SECTION_HEADINGS, split_sections
+
+DEFAULT_STORE = '.iso27001_store'
+READ_BLOCK_SIZE = 64 * 1024
+COMPRESSION_LEVEL = 6
+# Header lines that differ on every run; the change check leaves them out
+VOLATILE_HEADER = re.compile(r'^Last Updated:.*$', re.MULTILINE)
+
+
+class ContentStore:
+    """Content-addressed store of generated packs
+
+    Sections are stored once as zlib-compressed blobs named by the SHA-256
+    of their text; a pack is a small JSON list of its section hashes, named
+    by the SHA-256 of the whole pack text (the same digest sha256sum gives
+    for the exported file). Every generation only appends a pointer line to
+    the generation log and updates the label's ref file, so an unchanged
+    nightly run costs only its header blob. Each pack also records a
+    content hash that leaves out the run date, so "did anything change" is
+    a comparison of two content hashes.
+    """
+
+    def __init__(self, directory=DEFAULT_STORE):
+        self.directory = directory
+        self.log_path = os.path.join(directory, 'generations.log')
+        os.makedirs(os.path.join(directory, 'packs'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'refs'), exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def _pack_path(self, digest):
+        return os.path.join(self.directory, 'packs', f"{digest}.json")
+
+    def _ref_path(self, label):
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', label or '').strip('_') or 'default'
+        return os.path.join(self.directory, 'refs', name)
+
+    def _write_atomic(self, path, write):
+        # Write through a temporary file so concurrent writers of the same
+        # content never expose a partial object
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                result = write(f)
+            os.replace(temp_path, path)
+            return result
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def put_blob(self, chunks, pack_digest=None):
+        """Store text chunks as one compressed blob and return its hash
+
+        Chunks are hashed and compressed as they stream, so large sections
+        are never held in memory; pack_digest, if given, is updated too.
+        """
+        digest = hashlib.sha256()
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.join(self.directory, 'objects'), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    data = chunk.encode('utf-8')
+                    digest.update(data)
+                    if pack_digest is not None:
+                        pack_digest.update(data)
+                    f.write(compressor.compress(data))
+                f.write(compressor.flush())
+            blob = digest.hexdigest()
+            path = self._object_path(blob)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+            return blob
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def put_pack(self, sections, label=None):
+        """Store (section, chunks) pairs as a pack and log the generation
+
+        Returns (pack hash, changed), where changed is False when the pack
+        only differs from the latest generation with the same label in its
+        Last Updated date.
+        """
+        pack_digest = hashlib.sha256()
+        content_digest = hashlib.sha256()
+        entries = []
+        for section, chunks in sections:
+            if section == 'header':
+                # A few lines, so held in memory to drop the volatile ones
+                chunks = list(chunks)
+                content_digest.update(VOLATILE_HEADER.sub('', "".join(chunks)).encode('utf-8'))
+                blob = self.put_blob(chunks, pack_digest)
+            else:
+                blob = self.put_blob(chunks, pack_digest)
+                content_digest.update(f"{section}\t{blob}\n".encode('utf-8'))
+            entries.append([section, blob])
+        pack = pack_digest.hexdigest()
+        content = content_digest.hexdigest()
+        path = self._pack_path(pack)
+        if not os.path.exists(path):
+            self._write_atomic(path, lambda f: f.write(
+                json.dumps({'content': content, 'sections': entries}).encode('utf-8')))
+
+        previous = self.latest(label)
+        changed = previous is None or self.content(previous) != content
+        self._write_atomic(self._ref_path(label), lambda f: f.write(pack.encode('ascii')))
+        line = f"{datetime.now().isoformat(timespec='seconds')}\t{pack}\t{label or ''}\n"
+        # One short O_APPEND write per generation, safe across batch workers
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+        return pack, changed
+
+    def put_text(self, text, label=None):
+        """Store an existing pack file's text, split at its top-level headings"""
+        return self.put_pack(((section, [body]) for section, body in split_sections(text, SECTION_HEADINGS)), label)
+
+    def has(self, pack):
+        return os.path.exists(self._pack_path(pack))
+
+    def generations(self):
+        """(timestamp, pack hash, label) of every logged generation, oldest first"""
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path, encoding='utf-8') as f:
+            return [tuple(line.rstrip('\n').split('\t')) for line in f if line.strip()]
+
+    def latest(self, label=None):
+        """Hash of the most recent generation with this label, read from its ref"""
+        try:
+            with open(self._ref_path(label), encoding='ascii') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _read_pack(self, pack):
+        with open(self._pack_path(pack), encoding='utf-8') as f:
+            return json.load(f)
+
+    def sections(self, pack):
+        return self._read_pack(pack)['sections']
+
+    def content(self, pack):
+        """Content hash of a pack, or None for packs stored before it was recorded"""
+        try:
+            return self._read_pack(pack).get('content')
+        except FileNotFoundError:
+            return None
+
+    def iter_blob(self, blob):
+        """Yield a blob's text, decompressing it block by block"""
+        decompressor = zlib.decompressobj()
+        # Multi-byte characters may straddle block boundaries
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        with open(self._object_path(blob), 'rb') as f:
+            while True:
+                block = f.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                yield decoder.decode(decompressor.decompress(block))
+        yield decoder.decode(decompressor.flush(), final=True)
+
+    def iter_pack(self, pack):
+        for _, blob in self.sections(pack):
+            yield from self.iter_blob(blob)
+
+    def disk_usage(self):
+        """(number of blobs, compressed bytes on disk)"""
+        count = size = 0
+        for root, _, files in os.walk(os.path.join(self.directory, 'objects')):
+            for name in files:
+                count += 1
+                size += os.path.getsize(os.path.join(root, name))
+        return count, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed store of generated documentation packs")
+    parser.add_argument('--store', default=DEFAULT_STORE, help="Store directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Store existing generated packs")
+    add.add_argument('paths', nargs='+')
+    add.add_argument('--label', help="Generation label (default: file name)")
+
+    commands.add_parser('log', help="List stored generations")
+
+    export = commands.add_parser('export', help="Write a stored pack back out as text")
+    export.add_argument('pack', help="Pack hash or a unique prefix of it")
+    export.add_argument('-o', '--output', help="Output file (default: stdout)")
+
+    commands.add_parser('stats', help="Show stored packs, blobs and disk usage")
+    args = parser.parse_args()
+
+    store = ContentStore(args.store)
+    if args.command == 'add':
+        for path in args.paths:
+            with open(path, encoding='utf-8') as f:
+                pack, changed = store.put_text(f.read(), args.label or os.path.basename(path))
+            print(f"{pack[:12]}  {'stored' if changed else 'unchanged'}  {path}")
+    elif args.command == 'log':
+        for timestamp, pack, label in store.generations():
+            print(f"{timestamp}  {pack[:12]}  {label}")
+    elif args.command == 'export':
+        matches = [name[:-5] for name in os.listdir(os.path.join(args.store, 'packs'))
+                   if name.startswith(args.pack) and name.endswith('.json')]
+        if len(matches) != 1:
+            parser.error(f"{len(matches)} stored packs match {args.pack!r}")
+        output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for chunk in store.iter_pack(matches[0]):
+                output.write(chunk)
+        finally:
+            if args.output:
+                output.close()
+    else:
+        packs = len(os.listdir(os.path.join(args.store, 'packs')))
+        blobs, size = store.disk_usage()
+        print(f"{len(store.generations())} generations, {packs} distinct packs, "
+              f"{blobs} section blobs, {size / 1024:,.1f} KB on disk")
+
+
+if __name__ == "__main__":
+    main()
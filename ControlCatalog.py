@@ -0,0 +1,218 @@
+# ISO 27001:2022 Annex A controls with ISO 27002:2022 control type and
+# cybersecurity concept attributes
+
+THEMES = {
+    '5': "Organizational",
+    '6': "People",
+    '7': "Physical",
+    '8': "Technological",
+}
+
+# Control types
+P, D, C = "Preventive", "Detective", "Corrective"
+# Cybersecurity concepts
+ID, PR, DE, RS, RC = "Identify", "Protect", "Detect", "Respond", "Recover"
+
+ANNEX_A_CONTROLS = [
+    ("5.1", "Policies for information security", (P,), (ID,)),
+    ("5.2", "Information security roles and responsibilities", (P,), (ID,)),
+    ("5.3", "Segregation of duties", (P,), (PR,)),
+    ("5.4", "Management responsibilities", (P,), (ID,)),
+    ("5.5", "Contact with authorities", (P, C), (ID, PR, RS, RC)),
+    ("5.6", "Contact with special interest groups", (P, C), (PR, RS, RC)),
+    ("5.7", "Threat intelligence", (P, D, C), (ID, DE, RS)),
+    ("5.8", "Information security in project management", (P,), (ID, PR)),
+    ("5.9", "Inventory of information and other associated assets", (P,), (ID,)),
+    ("5.10", "Acceptable use of information and other associated assets", (P,), (PR,)),
+    ("5.11", "Return of assets", (P,), (PR,)),
+    ("5.12", "Classification of information", (P,), (ID,)),
+    ("5.13", "Labelling of information", (P,), (PR,)),
+    ("5.14", "Information transfer", (P,), (PR,)),
+    ("5.15", "Access control", (P,), (PR,)),
+    ("5.16", "Identity management", (P,), (PR,)),
+    ("5.17", "Authentication information", (P,), (PR,)),
+    ("5.18", "Access rights", (P,), (PR,)),
+    ("5.19", "Information security in supplier relationships", (P,), (ID,)),
+    ("5.20", "Addressing information security within supplier agreements", (P,), (ID,)),
+    ("5.21", "Managing information security in the ICT supply chain", (P,), (ID,)),
+    ("5.22", "Monitoring, review and change management of supplier services", (P,), (ID,)),
+    ("5.23", "Information security for use of cloud services", (P,), (PR,)),
+    ("5.24", "Information security incident management planning and preparation", (C,), (RS, RC)),
+    ("5.25", "Assessment and decision on information security events", (D,), (DE, RS)),
+    ("5.26", "Response to information security incidents", (C,), (RS, RC)),
+    ("5.27", "Learning from information security incidents", (P,), (ID, PR)),
+    ("5.28", "Collection of evidence", (C,), (DE, RS)),
+    ("5.29", "Information security during disruption", (P, C), (PR, RS)),
+    ("5.30", "ICT readiness for business continuity", (C,), (RS,)),
+    ("5.31", "Legal, statutory, regulatory and contractual requirements", (P,), (ID,)),
+    ("5.32", "Intellectual property rights", (P,), (ID,)),
+    ("5.33", "Protection of records", (P,), (ID, PR)),
+    ("5.34", "Privacy and protection of PII", (P,), (ID, PR)),
+    ("5.35", "Independent review of information security", (P, C), (ID, PR)),
+    ("5.36", "Compliance with policies, rules and standards for information security", (P,), (ID, PR)),
+    ("5.37", "Documented operating procedures", (P, C), (PR, RC)),
+    ("6.1", "Screening", (P,), (PR,)),
+    ("6.2", "Terms and conditions of employment", (P,), (PR,)),
+    ("6.3", "Information security awareness, education and training", (P,), (PR,)),
+    ("6.4", "Disciplinary process", (P, C), (PR, RS)),
+    ("6.5", "Responsibilities after termination or change of employment", (P,), (PR,)),
+    ("6.6", "Confidentiality or non-disclosure agreements", (P,), (PR,)),
+    ("6.7", "Remote working", (P,), (PR,)),
+    ("6.8", "Information security event reporting", (D,), (DE,)),
+    ("7.1", "Physical security perimeters", (P,), (PR,)),
+    ("7.2", "Physical entry", (P,), (PR,)),
+    ("7.3", "Securing offices, rooms and facilities", (P,), (PR,)),
+    ("7.4", "Physical security monitoring", (P, D), (PR, DE)),
+    ("7.5", "Protecting against physical and environmental threats", (P,), (PR,)),
+    ("7.6", "Working in secure areas", (P,), (PR,)),
+    ("7.7", "Clear desk and clear screen", (P,), (PR,)),
+    ("7.8", "Equipment siting and protection", (P,), (PR,)),
+    ("7.9", "Security of assets off-premises", (P,), (PR,)),
+    ("7.10", "Storage media", (P,), (PR,)),
+    ("7.11", "Supporting utilities", (P, D), (PR, DE)),
+    ("7.12", "Cabling security", (P,), (PR,)),
+    ("7.13", "Equipment maintenance", (P,), (PR,)),
+    ("7.14", "Secure disposal or re-use of equipment", (P,), (PR,)),
+    ("8.1", "User endpoint devices", (P,), (PR,)),
+    ("8.2", "Privileged access rights", (P,), (PR,)),
+    ("8.3", "Information access restriction", (P,), (PR,)),
+    ("8.4", "Access to source code", (P,), (PR,)),
+    ("8.5", "Secure authentication", (P,), (PR,)),
+    ("8.6", "Capacity management", (P, D), (ID, PR, DE)),
+    ("8.7", "Protection against malware", (P, D, C), (PR, DE)),
+    ("8.8", "Management of technical vulnerabilities", (P,), (ID, PR)),
+    ("8.9", "Configuration management", (P,), (PR,)),
+    ("8.10", "Information deletion", (P,), (PR,)),
+    ("8.11", "Data masking", (P,), (PR,)),
+    ("8.12", "Data leakage prevention", (P, D), (PR, DE)),
+    ("8.13", "Information backup", (C,), (RC,)),
+    ("8.14", "Redundancy of information processing facilities", (P,), (PR,)),
+    ("8.15", "Logging", (D,), (DE,)),
+    ("8.16", "Monitoring activities", (D, C), (DE, RS)),
+    ("8.17", "Clock synchronization", (D,), (PR, DE)),
+    ("8.18", "Use of privileged utility programs", (P,), (PR,)),
+    ("8.19", "Installation of software on operational systems", (P,), (PR,)),
+    ("8.20", "Networks security", (P, D), (PR, DE)),
+    ("8.21", "Security of network services", (P,), (PR,)),
+    ("8.22", "Segregation of networks", (P,), (PR,)),
+    ("8.23", "Web filtering", (P,), (PR,)),
+    ("8.24", "Use of cryptography", (P,), (PR,)),
+    ("8.25", "Secure development life cycle", (P,), (PR,)),
+    ("8.26", "Application security requirements", (P,), (PR,)),
+    ("8.27", "Secure system architecture and engineering principles", (P,), (PR,)),
+    ("8.28", "Secure coding", (P,), (PR,)),
+    ("8.29", "Security testing in development and acceptance", (P,), (ID,)),
+    ("8.30", "Outsourced development", (P, D), (ID, PR, DE)),
+    ("8.31", "Separation of development, test and production environments", (P,), (PR,)),
+    ("8.32", "Change management", (P,), (PR,)),
+    ("8.33", "Test information", (P,), (PR,)),
+    ("8.34", "Protection of information systems during audit testing", (P,), (PR,)),
+]
+
+# Columns of the "1. CONTROL IMPLEMENTATION" table in the Statement of
+# Applicability template (DocTemplates.py)
+SOA_COLUMNS = ("Control ID", "Control Name", "Applicable?", "Justification", "Implementation Status")
+# Optional column listing indexed evidence files (EvidenceIndex.py)
+EVIDENCE_COLUMN = "Evidence"
+EVIDENCE_PLACEHOLDER = "[Evidence]"
+
+
+class Control:
+    """A single Annex A control"""
+    __slots__ = ('control_id', 'name', 'theme', 'control_types', 'concepts')
+
+    def __init__(self, control_id, name, control_types, concepts):
+        self.control_id = control_id
+        self.name = name
+        self.theme = THEMES[control_id.split('.')[0]]
+        self.control_types = control_types
+        self.concepts = concepts
+
+    @property
+    def attributes(self):
+        return self.control_types + self.concepts
+
+    def __repr__(self):
+        return f"Control({self.control_id!r}, {self.name!r})"
+
+
+class ControlCatalog:
+    """Annex A controls indexed by control ID, theme and attribute"""
+
+    def __init__(self, rows=ANNEX_A_CONTROLS):
+        self.controls = tuple(Control(*row) for row in rows)
+        self.by_id = {control.control_id: control for control in self.controls}
+
+        by_theme = {}
+        by_attribute = {}
+        for control in self.controls:
+            by_theme.setdefault(control.theme, []).append(control)
+            for attribute in control.attributes:
+                by_attribute.setdefault(attribute, []).append(control)
+        self.by_theme = {theme: tuple(controls) for theme, controls in by_theme.items()}
+        self.by_attribute = {attribute: tuple(controls) for attribute, controls in by_attribute.items()}
+
+        # SoA rows only vary in the decision columns, so the ID and name
+        # cells are padded and cached once per control
+        self.id_width = max(len(SOA_COLUMNS[0]), *(len(c.control_id) for c in self.controls))
+        self.name_width = max(len(SOA_COLUMNS[1]), *(len(c.name) for c in self.controls))
+        self.row_prefixes = {
+            control.control_id: f"| {control.control_id:<{self.id_width}} | {control.name:<{self.name_width}} |"
+            for control in self.controls
+        }
+
+    def __len__(self):
+        return len(self.controls)
+
+    def get(self, control_id):
+        return self.by_id.get(control_id)
+
+    def theme(self, theme):
+        return self.by_theme.get(theme, ())
+
+    def with_attribute(self, attribute):
+        return self.by_attribute.get(attribute, ())
+
+    def soa_rows(self, decisions=None, themes=None, evidence=None):
+        """Yield Statement of Applicability table rows
+
+        decisions maps control IDs to dicts with optional 'applicable',
+        'justification' and 'status' keys; controls without a decision are
+        listed as applicable with placeholders to complete. evidence, if
+        given, maps control IDs to the cell of an extra Evidence column.
+        """
+        columns = SOA_COLUMNS
+        widths = (self.id_width, self.name_width, 11, 13, 21)
+        if evidence is not None:
+            columns += (EVIDENCE_COLUMN,)
+            widths += (max([len(EVIDENCE_PLACEHOLDER), *map(len, evidence.values())]),)
+        yield "| " + " | ".join(f"{title:<{width}}" for title, width in zip(columns, widths)) + " |"
+        yield "|" + "|".join("-" * (width + 2) for width in widths) + "|"
+
+        for control, applicable, justification, status in self._decided(decisions, themes):
+            row = (
+                f"{self.row_prefixes[control.control_id]} {applicable:<11} | "
+                f"{justification:<13} | {status:<21} |"
+            )
+            if evidence is not None:
+                row += f" {evidence.get(control.control_id, EVIDENCE_PLACEHOLDER):<{widths[-1]}} |"
+            yield row
+
+    def soa_records(self, decisions=None, themes=None):
+        """Yield SoA cell tuples in SOA_COLUMNS order, e.g. for TableEngine"""
+        for control, applicable, justification, status in self._decided(decisions, themes):
+            yield control.control_id, control.name, applicable, justification, status
+
+    def _decided(self, decisions, themes):
+        decisions = decisions or {}
+        controls = self.controls if themes is None else [c for theme in themes for c in self.theme(theme)]
+        for control in controls:
+            decision = decisions.get(control.control_id) or {}
+            applicable = decision.get('applicable', True)
+            if isinstance(applicable, bool):
+                applicable = "Yes" if applicable else "No"
+            yield (control, applicable, decision.get('justification', '[Reason]'),
+                   decision.get('status', '[Status]'))
+
+
+CATALOG = ControlCatalog()
@@ -0,0 +1,131 @@
+import argparse
+import heapq
+import json
+
+from ControlCatalog import CATALOG, THEMES
+from RiskEngine import ACCEPT, RiskRegister
+
+# Risk IDs quoted in a generated SoA justification before summarising the rest
+JUSTIFICATION_RISKS = 3
+
+
+def control_ids(cell):
+    """Split a register 'controls' cell such as '5.15; 8.2, 8.5' into control IDs"""
+    return [part for part in cell.replace(',', ' ').replace(';', ' ').split() if part]
+
+
+class CoverageMatrix:
+    """Sparse risk-to-control mapping built from a register's 'controls' column
+
+    Only the non-empty cells of the risk x control matrix are stored, as
+    index lists in both directions, so registers with hundreds of thousands
+    of risks and 93 controls cost memory in proportion to their mappings.
+    Both directions are filled in one pass over the register.
+    """
+
+    def __init__(self, register, catalog=CATALOG):
+        self.register = register
+        self.catalog = catalog
+        self.controls_by_risk = {}
+        self.risks_by_control = {}
+        self.unknown_controls = {}
+        for index, cell in enumerate(register.text_columns.get('controls', ())):
+            if not cell:
+                continue
+            mapped = []
+            for control_id in control_ids(cell):
+                if control_id in catalog.by_id:
+                    self.risks_by_control.setdefault(control_id, []).append(index)
+                    mapped.append(control_id)
+                else:
+                    self.unknown_controls.setdefault(control_id, []).append(index)
+            if mapped:
+                self.controls_by_risk[index] = mapped
+
+    def risks_for(self, control_id):
+        """Risk IDs justifying a control, highest level first"""
+        levels = self.register.levels
+        indexes = sorted(self.risks_by_control.get(control_id, ()), key=levels.__getitem__, reverse=True)
+        return [self.register.risk_ids[index] for index in indexes]
+
+    def uncovered_risks(self):
+        """Risks that need treatment but map to no Annex A control, highest first"""
+        decisions = self.register.decisions
+        uncovered = []
+        for index in self.register.order:
+            if decisions[index] == ACCEPT:
+                break
+            if index not in self.controls_by_risk:
+                uncovered.append(self.register.risk_ids[index])
+        return uncovered
+
+    def unjustified_controls(self, decisions=None):
+        """Applicable controls that no risk maps to"""
+        decisions = decisions or {}
+        return [
+            control.control_id for control in self.catalog.controls
+            if control.control_id not in self.risks_by_control
+            and (decisions.get(control.control_id) or {}).get('applicable', True) not in (False, "No")
+        ]
+
+    def controls_per_theme(self):
+        """Number of mapped controls of each theme"""
+        counts = dict.fromkeys(THEMES.values(), 0)
+        for control_id in self.risks_by_control:
+            counts[self.catalog.get(control_id).theme] += 1
+        return counts
+
+    def soa_decisions(self, decisions=None):
+        """SoA decisions with the mapped risks as justification where none is given"""
+        merged = dict(decisions or {})
+        for control_id in self.risks_by_control:
+            decision = dict(merged.get(control_id) or {})
+            if not decision.get('justification'):
+                indexes = self.risks_by_control[control_id]
+                top = heapq.nlargest(JUSTIFICATION_RISKS, indexes, key=self.register.levels.__getitem__)
+                justification = "Risks " + ", ".join(self.register.risk_ids[index] for index in top)
+                if len(indexes) > JUSTIFICATION_RISKS:
+                    justification += f" (+{len(indexes) - JUSTIFICATION_RISKS})"
+                decision['justification'] = justification
+                merged[control_id] = decision
+        return merged
+
+    def gap_report(self, decisions=None, limit=20):
+        """Yield a coverage and gap analysis summary"""
+        uncovered = self.uncovered_risks()
+        unjustified = self.unjustified_controls(decisions)
+        yield (f"COVERAGE: {len(self.controls_by_risk)} of {len(self.register)} risks mapped to "
+               f"{len(self.risks_by_control)} of {len(self.catalog.controls)} controls")
+        for theme, count in self.controls_per_theme().items():
+            yield f"  {theme:<16} {count:>3} of {len(self.catalog.theme(theme))} controls justified by risks"
+        yield f"UNCOVERED RISKS (treatment required, no control): {len(uncovered)}"
+        for risk_id in uncovered[:limit]:
+            yield f"  {risk_id}"
+        yield f"UNJUSTIFIED CONTROLS (applicable, no risk): {len(unjustified)}"
+        for control_id in unjustified[:limit]:
+            yield f"  {control_id:<6} {self.catalog.get(control_id).name}"
+        if self.unknown_controls:
+            yield f"UNKNOWN CONTROL IDS: {', '.join(sorted(self.unknown_controls))}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk-to-control coverage and gap analysis")
+    parser.add_argument('register', help="Risk register CSV with a 'controls' column of Annex A IDs")
+    parser.add_argument('--decisions', help="JSON file of SoA decisions keyed by control ID")
+    parser.add_argument('--limit', type=int, default=20, help="Gaps listed per category")
+    parser.add_argument('--soa', action='store_true', help="Print the SoA with risk-based justifications")
+    args = parser.parse_args()
+
+    decisions = None
+    if args.decisions:
+        with open(args.decisions) as f:
+            decisions = json.load(f)
+    matrix = CoverageMatrix(RiskRegister.from_csv(args.register))
+    for line in matrix.gap_report(decisions, args.limit):
+        print(line)
+    if args.soa:
+        print("\n" + "\n".join(CATALOG.soa_rows(matrix.soa_decisions(decisions))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import difflib
+import re
+import sys
+from collections import Counter
+
+from ISO27001DocsGenerator import BASE_TEMPLATE, HEADER_FIELDS, SECTION_HEADINGS
+
+CLAUSE_HEADING = re.compile(r'^(\d+(?:\.\d+)+)\s')
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@')
+
+# Every heading line of BASE_TEMPLATE, top-level and clause (4.1 ... 10.2),
+# mapped to its section key and title
+HEADINGS = {heading: (section, heading) for section, heading in SECTION_HEADINGS}
+for _line in BASE_TEMPLATE.splitlines():
+    _match = CLAUSE_HEADING.match(_line)
+    if _match:
+        HEADINGS[_line] = (_match.group(1), _line.rstrip(':'))
+
+# Above this many line pairs left after trimming a changed section's common
+# prefix and suffix, lines are matched by content instead of by
+# SequenceMatcher, which is quadratic on large rewritten tables
+SEQUENCE_DIFF_LIMIT = 4_000_000
+
+
+def split_clauses(text):
+    """Split a generated pack into (key, title, lines) at its heading lines
+
+    One pass over the lines with a dict lookup per line, so splitting is
+    linear in the size of the pack.
+    """
+    clauses = []
+    key, title, lines = 'header', "Document header", []
+    seen = Counter()
+    for line in text.splitlines(keepends=True):
+        heading = HEADINGS.get(line.rstrip('\n'))
+        if heading:
+            clauses.append((key, title, lines))
+            key, title = heading
+            seen[key] += 1
+            if seen[key] > 1:
+                key = f"{key}#{seen[key]}"
+            lines = []
+        lines.append(line)
+    clauses.append((key, title, lines))
+    return clauses
+
+
+def header_fields(lines):
+    fields = {}
+    for line in lines:
+        label, colon, value = line.partition(':')
+        if colon and label in HEADER_FIELDS:
+            fields[label] = value.strip()
+    return fields
+
+
+def _shift_hunk(line, offset):
+    # Hunk line numbers count from the section start, not the trimmed middle
+    match = HUNK_HEADER.match(line)
+    return (f"@@ -{int(match.group(1)) + offset}{match.group(2) or ''} "
+            f"+{int(match.group(3)) + offset}{match.group(4) or ''} @@\n")
+
+
+def diff_lines(old, new):
+    """Return (removed, added, diff lines) for two versions of one section"""
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    old_middle = old[start:len(old) - end]
+    new_middle = new[start:len(new) - end]
+
+    if len(old_middle) * len(new_middle) <= SEQUENCE_DIFF_LIMIT:
+        diff = [
+            _shift_hunk(line, start) if line.startswith('@@') else line
+            for line in list(difflib.unified_diff(old_middle, new_middle, n=2, lineterm='\n'))[2:]
+        ]
+        removed = sum(1 for line in diff if line.startswith('-'))
+        added = sum(1 for line in diff if line.startswith('+'))
+        return removed, added, diff
+
+    # Linear fallback: lines that occur more often in one version than the other
+    old_counts = Counter(old_middle)
+    new_counts = Counter(new_middle)
+    removed_counts = old_counts - new_counts
+    added_counts = new_counts - old_counts
+    diff = []
+    for line in old_middle:
+        if removed_counts[line]:
+            removed_counts[line] -= 1
+            diff.append('-' + line)
+    for line in new_middle:
+        if added_counts[line]:
+            added_counts[line] -= 1
+            diff.append('+' + line)
+    removed = sum(1 for line in diff if line[0] == '-')
+    return removed, len(diff) - removed, diff
+
+
+class SectionChange:
+    """How one clause differs between two packs"""
+    __slots__ = ('key', 'title', 'status', 'removed', 'added', 'diff')
+
+    def __init__(self, key, title, status, removed=0, added=0, diff=()):
+        self.key = key
+        self.title = title
+        self.status = status
+        self.removed = removed
+        self.added = added
+        self.diff = diff
+
+
+def diff_packs(old_text, new_text):
+    """Align two packs on their clause headings and diff the changed clauses
+
+    Returns (header changes, section changes); header changes are
+    (label, old, new) tuples such as the Version or Last Updated lines.
+    """
+    old_clauses = {key: (title, lines) for key, title, lines in split_clauses(old_text)}
+    new_clauses = split_clauses(new_text)
+
+    old_header = header_fields(old_clauses.get('header', ("", []))[1])
+    new_header = header_fields(new_clauses[0][2])
+    header_changes = [
+        (label, old_header.get(label), new_header.get(label))
+        for label in HEADER_FIELDS
+        if old_header.get(label) != new_header.get(label)
+    ]
+
+    changes = []
+    for key, title, lines in new_clauses:
+        if key not in old_clauses:
+            changes.append(SectionChange(key, title, 'added', 0, len(lines), ['+' + line for line in lines]))
+            continue
+        old_lines = old_clauses.pop(key)[1]
+        if old_lines == lines:
+            changes.append(SectionChange(key, title, 'unchanged'))
+            continue
+        removed, added, diff = diff_lines(old_lines, lines)
+        changes.append(SectionChange(key, title, 'changed', removed, added, diff))
+    for key, (title, lines) in old_clauses.items():
+        changes.append(SectionChange(key, title, 'removed', len(lines), 0, ['-' + line for line in lines]))
+    return header_changes, changes
+
+
+def change_summary(header_changes, changes):
+    """Yield a management review summary of what changed between two packs"""
+    changed = [change for change in changes if change.status != 'unchanged']
+    yield f"DOCUMENTATION CHANGE SUMMARY: {len(changed)} of {len(changes)} sections changed"
+    for label, old, new in header_changes:
+        yield f"  {label}: {old or '[none]'} -> {new or '[none]'}"
+    for change in changed:
+        yield f"  {change.status.upper():<9} {change.title}  (+{change.added} -{change.removed} lines)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Section-aligned diff between two generated documentation packs")
+    parser.add_argument('old', help="Earlier version of the pack")
+    parser.add_argument('new', help="Later version of the pack")
+    parser.add_argument('--summary-only', action='store_true', help="Print the change summary without diffs")
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    with open(args.old, encoding='utf-8') as f:
+        old_text = f.read()
+    with open(args.new, encoding='utf-8') as f:
+        new_text = f.read()
+    header_changes, changes = diff_packs(old_text, new_text)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for line in change_summary(header_changes, changes):
+            output.write(line + "\n")
+        if not args.summary_only:
+            for change in changes:
+                if change.diff:
+                    output.write(f"\n=== {change.title} ({change.status})\n")
+                    output.writelines(line if line.endswith('\n') else line + "\n" for line in change.diff)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
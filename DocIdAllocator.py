@@ -0,0 +1,250 @@
+import argparse
+import os
+import socket
+import sqlite3
+import uuid
+from collections import deque
+from datetime import datetime
+
+DEFAULT_DATABASE = 'iso27001_ids.db'
+DEFAULT_BLOCK_SIZE = 16
+
+# Every number below a sequence's next_number is in exactly one of
+# returned (free for reuse), leased (held by a running allocator) or issued
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequences (
+    doc_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    next_number INTEGER NOT NULL,
+    PRIMARY KEY (doc_type, year)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS returned (
+    doc_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    PRIMARY KEY (doc_type, year, number)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS leased (
+    doc_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    PRIMARY KEY (doc_type, year, number)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS leased_owner ON leased(owner);
+CREATE TABLE IF NOT EXISTS issued (
+    doc_type TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    issued_at TEXT NOT NULL,
+    PRIMARY KEY (doc_type, year, number)
+) WITHOUT ROWID;
+"""
+
+
+def format_id(doc_type, year, number):
+    """Document ID in the DocTemplates.py scheme, e.g. RA-26-07"""
+    return f"{doc_type}-{year % 100:02d}-{number:02d}"
+
+
+def parse_id(doc_id):
+    """(doc_type, year, number) of an ID made by format_id, in the century of this year"""
+    doc_type, year, number = doc_id.rsplit('-', 2)
+    return doc_type, datetime.now().year // 100 * 100 + int(year), int(number)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class DocIdAllocator:
+    """Sequential per type and year document IDs shared by parallel workers
+
+    Each allocator leases a block of numbers in one short write transaction
+    and hands IDs out of the block locally, so workers only touch the
+    database once per block_size documents. Committing an ID marks it
+    issued; IDs that are released, or still uncommitted when the allocator
+    closes, go back to a free pool that later leases draw from first, so
+    gaps left by parallel workers are filled before the sequence grows.
+    """
+
+    def __init__(self, path=DEFAULT_DATABASE, block_size=DEFAULT_BLOCK_SIZE, year=None):
+        self.path = path
+        self.block_size = block_size
+        self.year = year or datetime.now().year
+        self.owner = uuid.uuid4().hex
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+        self.blocks = {}
+        # Autocommit mode so leases can take the write lock up front
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def _transaction(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def _lease(self, doc_type):
+        """Lease the next block of numbers, reusing returned numbers first"""
+        key = (doc_type, self.year)
+        self._transaction()
+        try:
+            numbers = [row[0] for row in self.connection.execute(
+                "SELECT number FROM returned WHERE doc_type = ? AND year = ? ORDER BY number LIMIT ?",
+                (*key, self.block_size),
+            )]
+            self.connection.executemany(
+                "DELETE FROM returned WHERE doc_type = ? AND year = ? AND number = ?",
+                ((*key, number) for number in numbers),
+            )
+            wanted = self.block_size - len(numbers)
+            if wanted:
+                row = self.connection.execute(
+                    "SELECT next_number FROM sequences WHERE doc_type = ? AND year = ?", key
+                ).fetchone()
+                start = row[0] if row else 1
+                numbers.extend(range(start, start + wanted))
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO sequences (doc_type, year, next_number) VALUES (?, ?, ?)",
+                    (*key, start + wanted),
+                )
+            self.connection.executemany(
+                "INSERT INTO leased (doc_type, year, number, owner, host, pid) VALUES (?, ?, ?, ?, ?, ?)",
+                ((*key, number, self.owner, self.host, self.pid) for number in numbers),
+            )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.blocks[key] = deque(numbers)
+
+    def allocate(self, doc_type):
+        """Next ID of a document type for this allocator's year"""
+        block = self.blocks.get((doc_type, self.year))
+        if not block:
+            self._lease(doc_type)
+            block = self.blocks[(doc_type, self.year)]
+        return format_id(doc_type, self.year, block.popleft())
+
+    def _move(self, doc_ids, target):
+        now = datetime.now().isoformat(timespec='seconds')
+        self._transaction()
+        try:
+            for doc_id in doc_ids:
+                doc_type, year, number = parse_id(doc_id)
+                deleted = self.connection.execute(
+                    "DELETE FROM leased WHERE doc_type = ? AND year = ? AND number = ? AND owner = ?",
+                    (doc_type, year, number, self.owner),
+                ).rowcount
+                if not deleted:
+                    raise ValueError(f"{doc_id} is not leased by this allocator")
+                if target == 'issued':
+                    self.connection.execute(
+                        "INSERT INTO issued (doc_type, year, number, issued_at) VALUES (?, ?, ?, ?)",
+                        (doc_type, year, number, now),
+                    )
+                else:
+                    self.connection.execute(
+                        "INSERT INTO returned (doc_type, year, number) VALUES (?, ?, ?)",
+                        (doc_type, year, number),
+                    )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def commit(self, *doc_ids):
+        """Mark allocated IDs as issued to a written document"""
+        self._move(doc_ids, 'issued')
+
+    def release(self, *doc_ids):
+        """Return allocated IDs whose documents were not written"""
+        self._move(doc_ids, 'returned')
+
+    def _return_leases(self, owners):
+        returned = 0
+        self._transaction()
+        try:
+            for owner in owners:
+                self.connection.execute(
+                    "INSERT INTO returned (doc_type, year, number) "
+                    "SELECT doc_type, year, number FROM leased WHERE owner = ?", (owner,)
+                )
+                returned += self.connection.execute("DELETE FROM leased WHERE owner = ?", (owner,)).rowcount
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return returned
+
+    def close(self):
+        """Return every number still leased by this allocator, used or not, to the pool"""
+        self.blocks.clear()
+        self._return_leases([self.owner])
+        self.connection.close()
+
+    def reclaim(self):
+        """Return numbers leased by processes on this host that have exited
+
+        Workers killed before close() leave their leases behind; run this
+        once the pool has shut down. Returns the number of IDs reclaimed.
+        """
+        owners = self.connection.execute(
+            "SELECT DISTINCT owner, pid FROM leased WHERE host = ? AND owner != ?", (self.host, self.owner)
+        ).fetchall()
+        return self._return_leases([owner for owner, pid in owners if not _process_alive(pid)])
+
+    def status(self):
+        """(doc_type, year, issued, highest issued, free, leased) per sequence"""
+        return self.connection.execute(
+            """
+            SELECT s.doc_type, s.year,
+                   (SELECT COUNT(*) FROM issued i WHERE i.doc_type = s.doc_type AND i.year = s.year),
+                   (SELECT MAX(number) FROM issued i WHERE i.doc_type = s.doc_type AND i.year = s.year),
+                   (SELECT COUNT(*) FROM returned r WHERE r.doc_type = s.doc_type AND r.year = s.year),
+                   (SELECT COUNT(*) FROM leased l WHERE l.doc_type = s.doc_type AND l.year = s.year)
+            FROM sequences s ORDER BY s.year, s.doc_type
+            """
+        ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Allocate sequential document IDs such as RA-26-07")
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    allocate = commands.add_parser('allocate', help="Allocate and commit IDs")
+    allocate.add_argument('doc_type', help="Document type, e.g. CTX, RA, SOA or ISMS")
+    allocate.add_argument('-n', '--count', type=int, default=1)
+
+    commands.add_parser('reclaim', help="Return IDs leased by workers that exited without closing")
+    commands.add_parser('status', help="Show issued, free and leased numbers per sequence")
+    args = parser.parse_args()
+
+    allocator = DocIdAllocator(args.database, block_size=max(1, getattr(args, 'count', 1)))
+    try:
+        if args.command == 'allocate':
+            doc_ids = [allocator.allocate(args.doc_type.upper()) for _ in range(args.count)]
+            allocator.commit(*doc_ids)
+            print("\n".join(doc_ids))
+        elif args.command == 'reclaim':
+            print(f"Reclaimed {allocator.reclaim()} leased IDs")
+        else:
+            for doc_type, year, issued, highest, free, leased in allocator.status():
+                print(f"{doc_type:<6} {year}  issued {issued:>5} (highest {highest or 0})  "
+                      f"free {free:>4}  leased {leased:>4}")
+    finally:
+        allocator.close()
+
+
+if __name__ == "__main__":
+    main()
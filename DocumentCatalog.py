@@ -0,0 +1,152 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+from ISO27001DocsGenerator import parse_documentation
+
+DEFAULT_DATABASE = 'iso27001_catalog.db'
+
+# Catalogued header fields; each has its own index
+CATALOG_FIELDS = (
+    'doc_id', 'doc_title', 'version', 'classification', 'owner', 'approver', 'date', 'review_frequency',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    doc_id TEXT,
+    doc_title TEXT,
+    version TEXT,
+    classification TEXT,
+    owner TEXT,
+    approver TEXT,
+    date TEXT,
+    review_frequency TEXT,
+    catalogued_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    section TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (document_id, section)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS documents_doc_id ON documents(doc_id);
+CREATE INDEX IF NOT EXISTS documents_doc_title ON documents(doc_title);
+CREATE INDEX IF NOT EXISTS documents_version ON documents(version);
+CREATE INDEX IF NOT EXISTS documents_classification ON documents(classification);
+CREATE INDEX IF NOT EXISTS documents_owner ON documents(owner);
+CREATE INDEX IF NOT EXISTS documents_approver ON documents(approver);
+CREATE INDEX IF NOT EXISTS documents_date ON documents(date);
+CREATE INDEX IF NOT EXISTS documents_review_frequency ON documents(review_frequency);
+"""
+
+
+class DocumentCatalog:
+    """SQLite catalog of generated documents, their header fields and sections"""
+
+    def __init__(self, path=DEFAULT_DATABASE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, path, header, sections):
+        """Record one document; re-adding a path replaces its entry"""
+        self.add_many([(path, header, sections)])
+
+    def add_many(self, documents):
+        """Bulk insert (path, header, sections) tuples in a single transaction"""
+        now = datetime.now().isoformat(timespec='seconds')
+        columns = ", ".join(CATALOG_FIELDS)
+        placeholders = ", ".join("?" for _ in CATALOG_FIELDS)
+        count = 0
+        with self.connection:
+            for path, header, sections in documents:
+                path = os.path.abspath(path)
+                self.connection.execute("DELETE FROM documents WHERE path = ?", (path,))
+                cursor = self.connection.execute(
+                    f"INSERT INTO documents (path, {columns}, catalogued_at) VALUES (?, {placeholders}, ?)",
+                    (path, *(header.get(field) for field in CATALOG_FIELDS), now),
+                )
+                self.connection.executemany(
+                    "INSERT INTO sections (document_id, section, body) VALUES (?, ?, ?)",
+                    ((cursor.lastrowid, section, body) for section, body in sections),
+                )
+                count += 1
+        return count
+
+    def add_files(self, paths):
+        """Parse generated packs and bulk insert them"""
+        def parsed():
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    header, sections = parse_documentation(f.read())
+                yield path, header, sections
+        return self.add_many(parsed())
+
+    def find(self, **criteria):
+        """Documents whose header fields equal the given values, e.g. owner='X'"""
+        unknown = set(criteria) - set(CATALOG_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown catalog fields: {', '.join(sorted(unknown))}")
+        where = " AND ".join(f"{field} = ?" for field in criteria) or "1"
+        return self.connection.execute(
+            f"SELECT * FROM documents WHERE {where} ORDER BY date, doc_id", tuple(criteria.values())
+        ).fetchall()
+
+    def sections(self, document_id):
+        """(section, body) rows of a catalogued document"""
+        return self.connection.execute(
+            "SELECT section, body FROM sections WHERE document_id = ?", (document_id,)
+        ).fetchall()
+
+    def section(self, document_id, section):
+        row = self.connection.execute(
+            "SELECT body FROM sections WHERE document_id = ? AND section = ?", (document_id, section)
+        ).fetchone()
+        return row['body'] if row else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog and query generated ISO 27001 documents")
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Catalog generated documentation packs")
+    add.add_argument('paths', nargs='+')
+
+    find = commands.add_parser('find', help="List documents matching header fields")
+    for field in CATALOG_FIELDS:
+        find.add_argument(f"--{field.replace('_', '-')}", dest=field)
+
+    show = commands.add_parser('show', help="Print a section of a catalogued document")
+    show.add_argument('doc_id')
+    show.add_argument('section', help="Section key, e.g. header, 4 ... 10, records, soa")
+    args = parser.parse_args()
+
+    catalog = DocumentCatalog(args.database)
+    try:
+        if args.command == 'add':
+            print(f"Catalogued {catalog.add_files(args.paths)} documents in {args.database}")
+        elif args.command == 'find':
+            criteria = {field: getattr(args, field) for field in CATALOG_FIELDS if getattr(args, field)}
+            for row in catalog.find(**criteria):
+                print(f"{row['doc_id']}  v{row['version']}  {row['classification']}  "
+                      f"{row['owner']}  {row['date']}  {row['path']}")
+        elif args.command == 'show':
+            for row in catalog.find(doc_id=args.doc_id):
+                body = catalog.section(row['id'], args.section)
+                print(f"== {row['path']}\n{body if body is not None else '[No such section]'}")
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import argparse
+import fnmatch
+import hashlib
+import json
+import mmap
+import os
+import re
+import sqlite3
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from ControlCatalog import CATALOG
+
+DEFAULT_DATABASE = 'iso27001_evidence.db'
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+SHORT_HASH = 12
+SOA_EVIDENCE_LIMIT = 3
+
+# Annex A control IDs in evidence paths, e.g. "A.5.15 access review.pdf",
+# "8.24-key-inventory.xlsx" or "controls/5.1/policy.pdf"
+CONTROL_PATTERN = re.compile(r'(?<![\d.])(?:A\.?)?([5-8]\.\d{1,2})(?!\d|\.\d)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    indexed_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_root ON files(root);
+CREATE TABLE IF NOT EXISTS links (
+    control_id TEXT NOT NULL,
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    PRIMARY KEY (control_id, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS links_path ON links(path);
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    mapping TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def hash_file(path):
+    """SHA-256 of a file read through a memory map
+
+    Blocks are hashed from a memoryview of the map without copying, and
+    hashlib releases the GIL while it works, so files hash in parallel on
+    a thread pool.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for offset in range(0, len(view), HASH_BLOCK_SIZE):
+                    digest.update(view[offset:offset + HASH_BLOCK_SIZE])
+    return digest.hexdigest()
+
+
+def _hash_entry(entry):
+    path, size, mtime_ns = entry
+    try:
+        return path, size, mtime_ns, hash_file(path)
+    except FileNotFoundError:
+        # Removed while the index was running
+        return path, size, mtime_ns, None
+
+
+def path_controls(relative_path, mapping=None):
+    """Control IDs an evidence file belongs to, from its path and the glob mapping"""
+    controls = {match.group(1) for match in CONTROL_PATTERN.finditer(relative_path)}
+    for pattern, control_ids in (mapping or {}).items():
+        if fnmatch.fnmatch(relative_path, pattern):
+            controls.update([control_ids] if isinstance(control_ids, str) else control_ids)
+    return sorted(control_id for control_id in controls if CATALOG.get(control_id))
+
+
+class EvidenceIndex:
+    """SQLite index of evidence files, their SHA-256 hashes and Annex A controls
+
+    Files are only hashed when their size or modification time differs from
+    the indexed entry, so re-indexing gigabytes of unchanged evidence costs
+    one stat per file. An evidence reference is verified when the file on
+    disk still has the size and modification time it was hashed with.
+    """
+
+    def __init__(self, path=DEFAULT_DATABASE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def index(self, directory, mapping=None, workers=None, executor='thread'):
+        """Index an evidence directory; returns (files, hashed, removed, bytes hashed)
+
+        mapping maps path globs relative to the directory, e.g.
+        "hr/training/*", to the control IDs that evidence supports. It is
+        kept with the directory and reused when later runs pass none.
+        """
+        root = os.path.abspath(directory)
+        if mapping is None:
+            row = self.connection.execute("SELECT mapping FROM roots WHERE root = ?", (root,)).fetchone()
+            mapping = json.loads(row[0]) if row else {}
+        cached = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self.connection.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE root = ?", (root,)
+            )
+        }
+        entries = []
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime_ns))
+        changed = [entry for entry in entries if cached.get(entry[0]) != entry[1:]]
+
+        now = datetime.now().isoformat(timespec='seconds')
+        hashed = []
+        if changed:
+            pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+            with pool_class(max_workers=workers) as pool:
+                # Largest files first so one big file does not finish the run alone
+                changed.sort(key=lambda entry: entry[1], reverse=True)
+                futures = [pool.submit(_hash_entry, entry) for entry in changed]
+                hashed = [future.result() for future in as_completed(futures)]
+        missing = {path for path, _, _, digest in hashed if digest is None}
+        present = {path for path, _, _ in entries} - missing
+        removed = [path for path in cached if path not in present]
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO roots (root, mapping) VALUES (?, ?)", (root, json.dumps(mapping))
+            )
+            self.connection.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in removed))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files (path, root, size, mtime_ns, sha256, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((path, root, size, mtime_ns, digest, now) for path, size, mtime_ns, digest in hashed if digest),
+            )
+            # Links follow the current paths and mapping, so they are rebuilt for the whole root
+            self.connection.execute(
+                "DELETE FROM links WHERE path IN (SELECT path FROM files WHERE root = ?)", (root,)
+            )
+            self.connection.executemany(
+                "INSERT INTO links (control_id, path) VALUES (?, ?)",
+                (
+                    (control_id, path)
+                    for path in sorted(present)
+                    for control_id in path_controls(os.path.relpath(path, root).replace(os.sep, '/'), mapping)
+                ),
+            )
+        return (len(present), len(hashed) - len(missing), len(removed),
+                sum(size for _, size, _, digest in hashed if digest))
+
+    def evidence(self, control_ids=None):
+        """{control ID: [(relative path, sha256)]} of verified evidence files
+
+        Files changed or removed since they were indexed are left out.
+        """
+        query = ("SELECT l.control_id, f.path, f.root, f.size, f.mtime_ns, f.sha256 "
+                 "FROM links l JOIN files f ON f.path = l.path")
+        parameters = ()
+        if control_ids is not None:
+            control_ids = list(control_ids)
+            query += f" WHERE l.control_id IN ({', '.join('?' for _ in control_ids)})"
+            parameters = control_ids
+        verified = {}
+        results = {}
+        for control_id, path, root, size, mtime_ns, digest in self.connection.execute(
+                query + " ORDER BY l.control_id, f.path", parameters):
+            if path not in verified:
+                try:
+                    stat = os.stat(path)
+                    verified[path] = (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns)
+                except FileNotFoundError:
+                    verified[path] = False
+            if verified[path]:
+                results.setdefault(control_id, []).append((os.path.relpath(path, root), digest))
+        return results
+
+    def soa_evidence(self, limit=SOA_EVIDENCE_LIMIT):
+        """{control ID: SoA Evidence cell}, e.g. "hr/awareness.pdf (sha256:1a2b3c4d5e6f)" """
+        cells = {}
+        for control_id, files in self.evidence().items():
+            cell = "; ".join(f"{path} (sha256:{digest[:SHORT_HASH]})" for path, digest in files[:limit])
+            if len(files) > limit:
+                cell += f" (+{len(files) - limit})"
+            cells[control_id] = cell
+        return cells
+
+    def verify(self, workers=None):
+        """Re-hash every indexed file; yields (path, problem) for missing or altered files"""
+        rows = self.connection.execute("SELECT path, size, mtime_ns, sha256 FROM files ORDER BY path").fetchall()
+        expected = {path: digest for path, _, _, digest in rows}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_hash_entry, (path, size, mtime_ns)) for path, size, mtime_ns, _ in rows]
+            for future in as_completed(futures):
+                path, _, _, digest = future.result()
+                if digest is None:
+                    yield path, "missing"
+                elif digest != expected[path]:
+                    yield path, f"hash {digest[:SHORT_HASH]} does not match indexed {expected[path][:SHORT_HASH]}"
+
+
+def load_soa_evidence(path, limit=SOA_EVIDENCE_LIMIT):
+    """SoA Evidence cells of an index database; warns and returns none if it does not exist"""
+    if not os.path.exists(path):
+        warnings.warn(f"Evidence index {path} does not exist; build it with EvidenceIndex.py index")
+        return {}
+    index = EvidenceIndex(path)
+    try:
+        return index.soa_evidence(limit)
+    finally:
+        index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index evidence files by hash and link them to Annex A controls")
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index = commands.add_parser('index', help="Hash new and changed files of an evidence directory")
+    index.add_argument('directory')
+    index.add_argument('--mapping',
+                       help="JSON mapping path globs to control IDs, e.g. {\"hr/training/*\": [\"6.3\"]}")
+    index.add_argument('-w', '--workers', type=int, default=None, help="Hashing workers (default: number of CPUs)")
+    index.add_argument('--executor', choices=('thread', 'process'), default='thread',
+                       help="Hash on a thread pool (default) or a process pool")
+
+    controls = commands.add_parser('controls', help="List verified evidence per control")
+    controls.add_argument('control_ids', nargs='*')
+
+    verify = commands.add_parser('verify', help="Re-hash all indexed files and report altered or missing ones")
+    verify.add_argument('-w', '--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    evidence_index = EvidenceIndex(args.database)
+    try:
+        if args.command == 'index':
+            mapping = None
+            if args.mapping:
+                with open(args.mapping) as f:
+                    mapping = json.load(f)
+            files, hashed, removed, size = evidence_index.index(args.directory, mapping, args.workers,
+                                                                args.executor)
+            print(f"Indexed {files:,} files: {hashed:,} hashed ({size / 1024 / 1024:,.1f} MB), "
+                  f"{files - hashed:,} unchanged, {removed:,} removed")
+        elif args.command == 'controls':
+            for control_id, files in evidence_index.evidence(args.control_ids or None).items():
+                for path, digest in files:
+                    print(f"{control_id:<6} {digest[:SHORT_HASH]}  {path}")
+        else:
+            problems = 0
+            for path, problem in evidence_index.verify(args.workers):
+                problems += 1
+                print(f"{path}: {problem}")
+            print(f"{problems} altered or missing evidence files")
+    finally:
+        evidence_index.close()
+
+
+if __name__ == "__main__":
+    main()
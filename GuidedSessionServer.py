@@ -0,0 +1,349 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import re
+import uuid
+from contextlib import redirect_stdout
+
+from ISO27001DocsGenerator import GUIDED_STEPS, ComprehensiveISO27001Generator, ScriptedGenerator
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B85"
+SESSION_PATH = re.compile(r'^/sessions/([0-9a-f]{32})(/answer|/records|/document|/ws)?$')
+MAX_BODY_SIZE = 1024 * 1024
+MAX_FRAME_SIZE = 1024 * 1024
+MAX_HEADERS = 100
+# WebSocket close code for messages over MAX_FRAME_SIZE
+CLOSE_MESSAGE_TOO_BIG = 1009
+
+
+class BadRequest(ValueError):
+    """A malformed HTTP request, answered with 400 before the connection closes"""
+
+
+class FrameTooLarge(ValueError):
+    """A WebSocket message longer than MAX_FRAME_SIZE"""
+
+
+def describe_steps():
+    """Capture the guidance text and prompts of every guided step once"""
+    steps = []
+    for record, guide in GUIDED_STEPS:
+        generator = ScriptedGenerator()
+        with redirect_stdout(io.StringIO()) as guidance:
+            getattr(generator, guide)()
+        steps.append({
+            'record': record,
+            'guide': guide,
+            'guidance': guidance.getvalue().strip(),
+            'prompts': generator.prompts,
+        })
+    return steps
+
+
+class GuidedSession:
+    """One user's progress through the guided steps"""
+
+    def __init__(self, session_id, steps):
+        self.session_id = session_id
+        self.steps = steps
+        self.step = 0
+        self.answers = []
+        self.records = {}
+        self.draft = ""
+
+    @property
+    def done(self):
+        return self.step >= len(self.steps)
+
+    def state(self):
+        """Current prompt, or the collected records once every step is answered"""
+        if self.done:
+            return {'session_id': self.session_id, 'done': True, 'records': self.mandatory_records()}
+        step = self.steps[self.step]
+        title, prompt, hint = step['prompts'][len(self.answers)]
+        return {
+            'session_id': self.session_id,
+            'done': False,
+            'step': self.step + 1,
+            'steps': len(self.steps),
+            'record': step['record'],
+            'guidance': step['guidance'] if not self.answers else None,
+            'title': title,
+            'prompt': prompt,
+            'hint': hint,
+            'draft': self.draft,
+        }
+
+    def answer(self, text):
+        """Record an answer and advance to the next prompt"""
+        if self.done:
+            raise ValueError("Session is already complete")
+        self.answers.append(text)
+        self.draft = ""
+        step = self.steps[self.step]
+        if len(self.answers) == len(step['prompts']):
+            # Replay the guide method with the collected answers so the
+            # record has the same shape as in the interactive flow
+            generator = ScriptedGenerator(self.answers)
+            with redirect_stdout(io.StringIO()):
+                self.records[step['record']] = getattr(generator, step['guide'])()
+            self.step += 1
+            self.answers = []
+        return self.state()
+
+    def mandatory_records(self):
+        records = dict(self.records)
+        records['soa'] = ComprehensiveISO27001Generator().generate_soa()
+        return records
+
+
+class GuidedSessionServer:
+    """Serve guided sessions over HTTP (JSON) and WebSocket from one event loop
+
+    HTTP API:
+        POST   /sessions                 start a session
+        GET    /sessions/<id>            current prompt
+        POST   /sessions/<id>/answer     {"answer": "..."}
+        GET    /sessions/<id>/records    records collected so far
+        GET    /sessions/<id>/document   rendered documentation pack
+        DELETE /sessions/<id>            discard a session
+        GET    /sessions/<id>/ws         WebSocket; send {"type": "draft" |
+                                         "answer" | "state", "text": "..."}
+    """
+
+    def __init__(self):
+        self.steps = describe_steps()
+        self.sessions = {}
+
+    def create_session(self):
+        session = GuidedSession(uuid.uuid4().hex, self.steps)
+        self.sessions[session.session_id] = session
+        return session
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                match = SESSION_PATH.match(path)
+                if match and match.group(2) == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                    session = self.sessions.get(match.group(1))
+                    if session is None:
+                        await self._respond(writer, 404, {'error': "Unknown session"})
+                        break
+                    if 'sec-websocket-key' not in headers:
+                        await self._respond(writer, 400, {'error': "Missing Sec-WebSocket-Key"}, keep_alive=False)
+                        break
+                    await self._websocket(reader, writer, headers, session)
+                    break
+                status, payload = self.route(method, path, body)
+                await self._respond(writer, status, payload, keep_alive=headers.get('connection') != 'close')
+                if headers.get('connection') == 'close':
+                    break
+        except BadRequest as e:
+            await self._respond(writer, 400, {'error': str(e)}, keep_alive=False)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def route(self, method, path, body):
+        """Dispatch a plain HTTP request to the session engine"""
+        if path == '/sessions' and method == 'POST':
+            return 201, self.create_session().state()
+
+        match = SESSION_PATH.match(path)
+        session = self.sessions.get(match.group(1)) if match else None
+        if session is None:
+            return 404, {'error': "Unknown session"}
+
+        action = match.group(2)
+        if action is None and method == 'GET':
+            return 200, session.state()
+        if action is None and method == 'DELETE':
+            del self.sessions[session.session_id]
+            return 200, {'session_id': session.session_id, 'deleted': True}
+        if action == '/answer' and method == 'POST':
+            try:
+                message = json.loads(body or b'{}')
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            if not isinstance(message, dict) or 'answer' not in message:
+                return 400, {'error': "Body must be a JSON object with an 'answer'"}
+            try:
+                return 200, session.answer(str(message['answer']))
+            except ValueError as e:
+                return 400, {'error': str(e)}
+        if action == '/records' and method == 'GET':
+            return 200, session.records
+        if action == '/document' and method == 'GET':
+            if not session.done:
+                return 409, {'error': "Session is not complete"}
+            generator = ComprehensiveISO27001Generator()
+            return 200, generator.compile_mandatory_documentation(session.mandatory_records())
+        return 405, {'error': f"{method} not allowed on {path}"}
+
+    @staticmethod
+    async def _readline(reader):
+        try:
+            return await reader.readline()
+        except ValueError:
+            # Lines over the StreamReader limit (64 KiB by default)
+            raise BadRequest("Request line or header too long") from None
+
+    async def _read_request(self, reader):
+        request_line = await self._readline(reader)
+        if not request_line.strip():
+            return None
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise BadRequest("Malformed request line")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = await self._readline(reader)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise BadRequest(f"More than {MAX_HEADERS} headers")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = headers.get('content-length', '0')
+        if not length.isdigit():
+            raise BadRequest("Invalid Content-Length")
+        length = int(length)
+        if length > MAX_BODY_SIZE:
+            raise BadRequest(f"Request body over {MAX_BODY_SIZE} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), path.split('?', 1)[0], headers, body
+
+    async def _respond(self, writer, status, payload, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; charset=utf-8'
+        else:
+            body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+
+    async def _websocket(self, reader, writer, headers, session):
+        accept = base64.b64encode(
+            hashlib.sha1((headers['sec-websocket-key'] + WEBSOCKET_GUID).encode('ascii')).digest()
+        ).decode('ascii')
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode('latin-1')
+        )
+        writer.write(encode_frame(json.dumps(session.state()).encode('utf-8')))
+        await writer.drain()
+
+        while True:
+            try:
+                opcode, payload = await read_frame(reader)
+            except FrameTooLarge:
+                writer.write(encode_frame(CLOSE_MESSAGE_TOO_BIG.to_bytes(2, 'big'), 0x8))
+                await writer.drain()
+                return
+            if opcode == 0x8:
+                writer.write(encode_frame(b'', 0x8))
+                await writer.drain()
+                return
+            if opcode == 0x9:
+                writer.write(encode_frame(payload, 0xA))
+                await writer.drain()
+                continue
+            if opcode != 0x1:
+                continue
+
+            try:
+                message = json.loads(payload)
+                if not isinstance(message, dict):
+                    raise ValueError("Messages must be JSON objects")
+                kind = message.get('type')
+                if kind == 'draft':
+                    # Keystroke updates are stored without a reply
+                    session.draft = str(message.get('text', ''))
+                    continue
+                if kind == 'answer':
+                    reply = session.answer(str(message.get('text', '')))
+                else:
+                    reply = session.state()
+            except ValueError as e:
+                reply = {'error': str(e)}
+            writer.write(encode_frame(json.dumps(reply).encode('utf-8')))
+            await writer.drain()
+
+
+async def read_frame(reader, max_size=MAX_FRAME_SIZE):
+    """Read one (possibly fragmented) WebSocket message of at most max_size bytes"""
+    message_opcode = None
+    payload = b''
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = int.from_bytes(await reader.readexactly(2), 'big')
+        elif length == 127:
+            length = int.from_bytes(await reader.readexactly(8), 'big')
+        if len(payload) + length > max_size:
+            raise FrameTooLarge(f"WebSocket message over {max_size} bytes")
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        data = await reader.readexactly(length)
+        if mask and length:
+            key = (mask * (length // 4 + 1))[:length]
+            data = (int.from_bytes(data, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+        if opcode >= 0x8:
+            # Control frames may be interleaved with fragments
+            return opcode, data
+        if opcode:
+            message_opcode = opcode
+        payload += data
+        if first & 0x80:
+            return message_opcode, payload
+
+
+def encode_frame(payload, opcode=0x1):
+    """Encode an unmasked server-to-client WebSocket frame"""
+    length = len(payload)
+    if length < 126:
+        header = bytes([0x80 | opcode, length])
+    elif length < 65536:
+        header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, 'big')
+    else:
+        header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, 'big')
+    return header + payload
+
+
+async def serve(host, port):
+    server = GuidedSessionServer()
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Guided session service listening on http://{host}:{port}/sessions")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve guided ISO 27001 documentation sessions")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8027)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,68 @@
+import argparse
 from string import Template
 import json
 from datetime import datetime
-import uuid
 import time
-
-class ComprehensiveISO27001Generator:
-    def __init__(self):
-        # Mandatory clauses (4-10) template
-        self.base_template = """
+from collections import deque
+from collections.abc import Mapping
+from contextlib import nullcontext
+
+from AnswerJournal import AnswerJournal
+from AuditPlanner import load_plan
+from CompetenceImport import load_training
+from ControlCatalog import CATALOG
+from CoverageMatrix import CoverageMatrix
+from EvidenceIndex import load_soa_evidence
+from ObjectiveMonitor import ObjectiveMonitor
+from Profiler import PhaseProfiler
+from RiskEngine import load_register
+from SectionCache import SectionCache
+
+# Records collected by generate_mandatory_documentation and the
+# base_template placeholder each one fills
+RECORD_PLACEHOLDERS = {
+    'scope': 'scope_statement',
+    'risk_process': 'risk_assessment_process',
+    'policy': 'security_policy',
+    'soa': 'statement_applicability',
+    'objectives': 'security_objectives',
+    'competence': 'competence_requirements',
+    'operational_controls': 'operational_procedures',
+    'monitoring': 'monitoring_program',
+    'audit': 'audit_program',
+    'management_review': 'management_review',
+    'corrective_actions': 'corrective_action',
+}
+
+# Guided steps of generate_mandatory_documentation in prompt order:
+# record key and the guide method collecting it
+GUIDED_STEPS = [
+    ('scope', 'guide_scope_definition'),
+    ('risk_process', 'guide_risk_assessment_process'),
+    ('policy', 'guide_mandatory_policy'),
+    ('objectives', 'guide_security_objectives'),
+    ('competence', 'guide_competence_records'),
+    ('operational_controls', 'guide_operational_controls'),
+    ('monitoring', 'guide_monitoring_requirements'),
+    ('audit', 'guide_audit_program'),
+    ('management_review', 'guide_management_review'),
+    ('corrective_actions', 'guide_corrective_actions'),
+]
+
+MANDATORY_RECORDS = [
+    "Training, skills, experience and qualifications",
+    "Monitoring and measurement results",
+    "Internal audit program",
+    "Results of management reviews",
+    "Nature of nonconformities and subsequent actions",
+    "Results of corrective actions",
+]
+
+NOT_COMPLETED = "[To be completed]"
+DOC_TITLE = "Information Security Management System Documentation"
+
+# Mandatory clauses (4-10) template
+BASE_TEMPLATE = """
 INFORMATION SECURITY MANAGEMENT SYSTEM DOCUMENTATION
 
 Document ID: $doc_id
@@ -17,6 +72,7 @@ Classification: $classification
 Last Updated: $date
 Document Owner: $owner
 Approved By: $approver
+Review Frequency: $review_frequency
 
 ==========================================
 MANDATORY SECTIONS (ISO 27001:2022)
@@ -179,6 +235,170 @@ STATEMENT OF APPLICABILITY
 $statement_applicability
 """
 
+
+class RenderPlan:
+    """Template compiled into literal chunks and placeholder slots
+
+    Parsing follows string.Template syntax ($name, ${name}, $$) so the plan
+    renders exactly what Template.substitute would, but the template text is
+    scanned once instead of on every render.
+    """
+
+    def __init__(self, template):
+        self.parts = []
+        self.slots = []
+        position = 0
+        for match in Template.pattern.finditer(template):
+            literal = template[position:match.start()]
+            position = match.end()
+            if match.group('escaped') is not None:
+                self._append_literal(literal + Template.delimiter)
+                continue
+            name = match.group('named') or match.group('braced')
+            if name is None:
+                raise ValueError(f"Invalid placeholder in template at offset {match.start()}")
+            self._append_literal(literal)
+            self.slots.append((len(self.parts), name))
+            self.parts.append(None)
+        self._append_literal(template[position:])
+        self.placeholders = list(dict.fromkeys(name for _, name in self.slots))
+
+    def _append_literal(self, literal):
+        # Merge adjacent literals so rendering joins as few chunks as possible
+        if not literal:
+            return
+        if self.parts and self.parts[-1] is not None:
+            self.parts[-1] += literal
+        else:
+            self.parts.append(literal)
+
+    def render(self, values):
+        """Fill the placeholder slots from values and join in one pass"""
+        parts = self.parts[:]
+        for index, name in self.slots:
+            value = values[name]
+            parts[index] = value if isinstance(value, str) else "".join(_chunks(value))
+        return "".join(parts)
+
+    def iter_render(self, values):
+        """Yield the rendered text, streaming values given as iterables of chunks"""
+        slot_names = dict(self.slots)
+        pending = []
+        for index, part in enumerate(self.parts):
+            if part is None:
+                value = values[slot_names[index]]
+                if not isinstance(value, str) and hasattr(value, '__iter__'):
+                    if pending:
+                        yield "".join(pending)
+                        pending = []
+                    yield from _chunks(value)
+                    continue
+                part = str(value)
+            pending.append(part)
+        if pending:
+            yield "".join(pending)
+
+
+def _chunks(value):
+    """Text chunks of a placeholder value that may be a string or an iterable"""
+    if isinstance(value, str):
+        return (value,)
+    if hasattr(value, '__iter__'):
+        return (str(chunk) for chunk in value)
+    return (str(value),)
+
+
+def split_sections(template, headings):
+    """Split a template into (section, text) pairs at top-level headings"""
+    sections = []
+    key, start = 'header', 0
+    for section, heading in headings:
+        position = template.index(f"\n{heading}\n", start) + 1
+        sections.append((key, template[start:position]))
+        key, start = section, position
+    sections.append((key, template[start:]))
+    return sections
+
+
+# Top-level headings of BASE_TEMPLATE; the pack is rendered and written
+# one section at a time in this order
+SECTION_HEADINGS = [
+    ('4', "4. CONTEXT OF THE ORGANIZATION"),
+    ('5', "5. LEADERSHIP"),
+    ('6', "6. PLANNING"),
+    ('7', "7. SUPPORT"),
+    ('8', "8. OPERATION"),
+    ('9', "9. PERFORMANCE EVALUATION"),
+    ('10', "10. IMPROVEMENT"),
+    ('records', "MANDATORY RECORDS AND EVIDENCE"),
+    ('soa', "STATEMENT OF APPLICABILITY"),
+]
+
+# Header lines of a generated pack and the placeholder each one shows
+HEADER_FIELDS = {
+    'Document ID': 'doc_id',
+    'Document Title': 'doc_title',
+    'Version': 'version',
+    'Classification': 'classification',
+    'Last Updated': 'date',
+    'Document Owner': 'owner',
+    'Approved By': 'approver',
+    'Review Frequency': 'review_frequency',
+}
+
+RENDER_PLAN = RenderPlan(BASE_TEMPLATE)
+SECTION_PLANS = [
+    (section, RenderPlan(text))
+    for section, text in split_sections(BASE_TEMPLATE, SECTION_HEADINGS)
+]
+
+
+def parse_documentation(text):
+    """Split a generated pack into its header fields and (section, text) pairs"""
+    sections = split_sections(text, SECTION_HEADINGS)
+    header = {}
+    for line in sections[0][1].splitlines():
+        label, colon, value = line.partition(':')
+        if colon and label in HEADER_FIELDS:
+            header[HEADER_FIELDS[label]] = value.strip()
+    return header, sections
+
+
+def default_doc_id():
+    return f"ISMS-{datetime.now().strftime('%y')}-01"
+
+
+def measure_objectives(mandatory_records):
+    """ObjectiveMonitor fed with the 'measurements' CSV log(s) of an answer set"""
+    monitor = ObjectiveMonitor(mandatory_records['objective_definitions'])
+    paths = mandatory_records['measurements']
+    for path in [paths] if isinstance(paths, str) else paths:
+        monitor.ingest_csv(path)
+    return monitor
+
+
+def write_documentation(filename, chunks, buffer_size=64 * 1024):
+    """Stream documentation chunks to disk through a bounded write buffer"""
+    with open(filename, 'w', buffering=buffer_size) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return filename
+
+class ComprehensiveISO27001Generator:
+    def __init__(self, journal=None, resume_answers=(), profiler=None):
+        # Mandatory clauses (4-10) template, compiled once at import
+        self.base_template = BASE_TEMPLATE
+        self.render_plan = RENDER_PLAN
+        # Answers are journaled as they are entered; a resumed session
+        # replays its journal entries instead of prompting again
+        self.journal = journal
+        self.resume_answers = deque(resume_answers)
+        # Optional PhaseProfiler timing each phase and rendered section
+        self.profiler = profiler
+
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
     def explain_mandatory_requirements(self):
         """Explain ISO 27001 mandatory requirements"""
         print("""
@@ -366,36 +586,30 @@ regular training, and continuous improvement..."
             "Include commitment, scope, and objectives"
         )
 
-    def generate_mandatory_documentation(self):
-        """Generate all mandatory documentation"""
+    def generate_mandatory_documentation(self, cache=None, sections=False):
+        """Generate all mandatory documentation, as (section, chunks) pairs if sections is set"""
         print("\nGenerating Mandatory ISO 27001:2022 Documentation")
         
-        self.explain_mandatory_requirements()
+        if not self.resume_answers:
+            with self._phase('explain'):
+                self.explain_mandatory_requirements()
         
         # Collect mandatory elements
-        scope = self.guide_scope_definition()
-        risk_process = self.guide_risk_assessment_process()
-        policy = self.guide_mandatory_policy()
+        mandatory_records = {}
+        for record, guide in GUIDED_STEPS:
+            with self._phase(record):
+                mandatory_records[record] = getattr(self, guide)()
         
         # Generate Statement of Applicability
-        soa = self.generate_soa()
-        
-        # Collect all mandatory records
-        mandatory_records = {
-            'scope': scope,
-            'risk_process': risk_process,
-            'policy': policy,
-            'soa': soa,
-            'objectives': self.guide_security_objectives(),
-            'competence': self.guide_competence_records(),
-            'operational_controls': self.guide_operational_controls(),
-            'monitoring': self.guide_monitoring_requirements(),
-            'audit': self.guide_audit_program(),
-            'management_review': self.guide_management_review(),
-            'corrective_actions': self.guide_corrective_actions()
-        }
+        with self._phase('soa'):
+            mandatory_records['soa'] = self.generate_soa(
+                risk_register=mandatory_records.get('risk_register'),
+                evidence_index=mandatory_records.get('evidence_index'),
+            )
         
-        return self.compile_mandatory_documentation(mandatory_records)
+        if sections:
+            return self.iter_sections(mandatory_records, cache)
+        return self.iter_mandatory_documentation(mandatory_records, cache)
 
     def guide_security_objectives(self):
         """Guide through setting mandatory security objectives"""
@@ -419,11 +633,275 @@ Examples:
             "Include metrics and timeframes"
         )
 
-    # [Additional methods would continue with similar detailed guidance for each mandatory element]
+    def guide_competence_records(self):
+        """Guide through mandatory competence requirements"""
+        print("""
+COMPETENCE (Mandatory Requirement)
+-------------------------------
+You must determine and evidence the competence of people
+whose work affects information security:
+- Required skills and qualifications per role
+- Training, education or experience to close gaps
+- Records of training, skills, experience and qualifications
+
+Example:
+"All staff complete annual security awareness training; administrators
+hold a recognised security certification within 12 months of hire."
+""")
+        return self.guided_input(
+            "Competence Requirements",
+            "Describe your competence requirements: ",
+            "Include roles, required skills and evidence kept"
+        )
+
+    def guide_operational_controls(self):
+        """Guide through mandatory operational planning and control"""
+        print("""
+OPERATIONAL CONTROLS (Mandatory Requirement)
+----------------------------------------
+You must plan, implement and control the processes needed to
+meet information security requirements:
+- Documented operating procedures
+- Control of planned changes
+- Control of outsourced processes
+
+Example:
+"Changes to production systems follow the change management procedure
+with security review and approval before deployment."
+""")
+        return self.guided_input(
+            "Operational Controls",
+            "Describe your operational procedures: ",
+            "Include change control and outsourced processes"
+        )
+
+    def guide_monitoring_requirements(self):
+        """Guide through mandatory monitoring and measurement"""
+        print("""
+MONITORING AND MEASUREMENT (Mandatory Requirement)
+----------------------------------------------
+You must determine:
+- What needs to be monitored and measured
+- Methods for monitoring, measurement, analysis and evaluation
+- When monitoring is performed and who performs it
+- When results are analysed and evaluated
+
+Example:
+"Security KPIs are collected monthly by the ISMS manager and
+reported to management quarterly."
+""")
+        return self.guided_input(
+            "Monitoring Program",
+            "Describe your monitoring program: ",
+            "Include metrics, frequency and responsibilities"
+        )
+
+    def guide_audit_program(self):
+        """Guide through mandatory internal audit program"""
+        print("""
+INTERNAL AUDIT (Mandatory Requirement)
+----------------------------------
+Your audit program must define:
+- Audit frequency, methods and responsibilities
+- Audit criteria and scope for each audit
+- Auditor selection ensuring objectivity and impartiality
+- Reporting of results to relevant management
+
+Example:
+"All ISMS clauses and applicable Annex A controls are audited
+over a three-year cycle by independent internal auditors."
+""")
+        return self.guided_input(
+            "Audit Program",
+            "Describe your internal audit program: ",
+            "Include frequency, scope and auditor independence"
+        )
+
+    def guide_management_review(self):
+        """Guide through mandatory management review"""
+        print("""
+MANAGEMENT REVIEW (Mandatory Requirement)
+-------------------------------------
+Top management must review the ISMS at planned intervals, considering:
+- Status of actions from previous reviews
+- Changes in internal and external issues
+- Performance, audit results and nonconformities
+- Feedback from interested parties
+- Opportunities for continual improvement
+
+Example:
+"Management review is held twice a year, chaired by the CEO."
+""")
+        return self.guided_input(
+            "Management Review",
+            "Describe your management review schedule: ",
+            "Include frequency, attendees and inputs"
+        )
+
+    def guide_corrective_actions(self):
+        """Guide through mandatory nonconformity and corrective action"""
+        print("""
+NONCONFORMITY AND CORRECTIVE ACTION (Mandatory Requirement)
+-------------------------------------------------------
+When a nonconformity occurs you must:
+- React to control and correct it
+- Evaluate the need to eliminate its root cause
+- Implement and review the effectiveness of actions
+- Retain records of nonconformities and actions taken
+
+Example:
+"Nonconformities are logged in the ISMS register, root cause analysed
+within 10 working days and closed after effectiveness review."
+""")
+        return self.guided_input(
+            "Corrective Actions",
+            "Describe your corrective action process: ",
+            "Include logging, root cause analysis and closure"
+        )
+
+    def guided_input(self, title, prompt, hint):
+        """Prompt for a single answer with title and hint"""
+        if self.resume_answers:
+            if self.resume_answers[0]['title'] == title:
+                print(f"\n{title}: resumed from previous session")
+                return self.resume_answers.popleft()['answer']
+            # The journal no longer matches the guided steps
+            self.resume_answers.clear()
+
+        print(f"\n{title}")
+        print("-" * len(title))
+        print(f"Hint: {hint}")
+        answer = input(prompt)
+        if self.journal is not None:
+            self.journal.append(title, answer)
+        return answer
+
+    def generate_soa(self, decisions=None, risk_register=None, evidence_index=None):
+        """Generate the Statement of Applicability table from the Annex A catalog
+
+        With a risk register (a CSV path or a loaded RiskRegister) that maps
+        risks to controls, controls without an explicit justification are
+        justified by their risks.
+        With an evidence index database, an Evidence column lists each
+        control's verified evidence files with their hashes.
+        """
+        if risk_register:
+            decisions = CoverageMatrix(load_register(risk_register)).soa_decisions(decisions)
+        evidence = load_soa_evidence(evidence_index) if evidence_index else None
+        return "\n".join(CATALOG.soa_rows(decisions, evidence=evidence))
+
+    def template_values(self, mandatory_records):
+        """Map collected records onto base_template placeholders"""
+        values = {
+            'doc_id': default_doc_id(),
+            'doc_title': DOC_TITLE,
+            'version': "1.0",
+            'classification': "INTERNAL",
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'owner': "[To be assigned]",
+            'approver': "[To be assigned]",
+            'review_frequency': "Annual",
+            'mandatory_records': "\n".join(f"- {record}" for record in MANDATORY_RECORDS),
+        }
+        for name in self.render_plan.placeholders:
+            values.setdefault(name, NOT_COMPLETED)
+
+        for record, placeholder in RECORD_PLACEHOLDERS.items():
+            answer = mandatory_records.get(record)
+            if isinstance(answer, Mapping):
+                answer = "\n".join(f"{key.title()}: {value}" for key, value in answer.items())
+            if answer:
+                values[placeholder] = answer
+
+        # A risk register CSV feeds the risk treatment tables and plan
+        if mandatory_records.get('risk_register'):
+            register = load_register(mandatory_records['risk_register'])
+            values.update(register.template_values())
+
+        # Measurement logs report attainment of the defined objectives
+        if mandatory_records.get('objective_definitions') and mandatory_records.get('measurements'):
+            values.update(measure_objectives(mandatory_records).template_values())
+
+        # HR/LMS training exports evidence the training program
+        if mandatory_records.get('training_records'):
+            values.update(load_training(mandatory_records['training_records']).template_values())
+
+        # Scope inclusions and the auditor pool are scheduled into the audit program
+        if mandatory_records.get('audit_plan'):
+            values.update(load_plan(mandatory_records['audit_plan']).template_values())
+
+        # Answers may also fill any placeholder directly, e.g. 'internal_issues'
+        for name, answer in mandatory_records.items():
+            if name in values and name not in RECORD_PLACEHOLDERS and answer:
+                values[name] = answer
+        return values
+
+    def iter_mandatory_documentation(self, mandatory_records, cache=None):
+        """Yield the documentation pack section by section
+
+        With a SectionCache, only sections whose inputs changed since a
+        previous run are rendered; the rest are read back from the cache.
+        """
+        if self.profiler:
+            yield from self.profiler.profile_iter('compile', self._iter_sections(mandatory_records, cache), 'phase')
+        else:
+            yield from self._iter_sections(mandatory_records, cache)
+
+    def _iter_sections(self, mandatory_records, cache):
+        for _, chunks in self.iter_sections(mandatory_records, cache):
+            yield from chunks
+
+    def iter_sections(self, mandatory_records, cache=None):
+        """Yield (section, chunks) pairs in pack order; each section renders lazily"""
+        with self._phase('template_values'):
+            values = self.template_values(mandatory_records)
+        for section, plan in SECTION_PLANS:
+            if cache is None:
+                chunks = plan.iter_render(values)
+            else:
+                chunks = cache.render(section, plan, values)
+            if self.profiler:
+                chunks = self.profiler.profile_iter(section, chunks)
+            yield section, chunks
+
+    def compile_mandatory_documentation(self, mandatory_records):
+        """Compile collected records into the mandatory documentation pack"""
+        return "".join(self.iter_mandatory_documentation(mandatory_records))
+
+class ScriptedGenerator(ComprehensiveISO27001Generator):
+    """Generator whose guided prompts are answered from a prepared list
+
+    Used to run guide_* methods without a terminal: prompts are recorded
+    and answers are consumed in order, so a guide method returns exactly
+    what it would have returned interactively.
+    """
+
+    def __init__(self, answers=()):
+        super().__init__()
+        self.answers = deque(answers)
+        self.prompts = []
+
+    def guided_input(self, title, prompt, hint):
+        self.prompts.append((title, prompt, hint))
+        return self.answers.popleft() if self.answers else ""
 
 def main():
+    parser = argparse.ArgumentParser(description="Guided ISO 27001:2022 documentation generator")
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help="Record per-phase timings to PREFIX.json and PREFIX.trace.json")
+    parser.add_argument('--index', metavar='DATABASE',
+                        help="Add the generated pack to this full-text search index")
+    parser.add_argument('--store', metavar='DIRECTORY',
+                        help="Keep the pack in this content-addressed store instead of a timestamped file")
+    parser.add_argument('--cache-dir', metavar='DIRECTORY',
+                        help="Reuse rendered sections whose inputs are unchanged since the last run")
+    args = parser.parse_args()
+    if args.store and args.index:
+        parser.error("--index needs a pack file; index packs exported from the store instead")
+
     print("Starting Comprehensive ISO 27001:2022 Documentation Generator...")
-    generator = ComprehensiveISO27001Generator()
+    profiler = PhaseProfiler() if args.profile else None
+    generator = ComprehensiveISO27001Generator(profiler=profiler)
     
     print("""
 Welcome to the ISO 27001:2022 Documentation Generator
@@ -440,14 +918,53 @@ Would you like to:
     if choice == '1':
         generator.explain_mandatory_requirements()
     
-    documentation = generator.generate_mandatory_documentation()
-    
-    # Save documentation
-    filename = f"ISO27001_Mandatory_Documentation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-    with open(filename, 'w') as f:
-        f.write(documentation)
+    # Offer to resume an interrupted session from its answer journal
+    journal = None
+    for path in AnswerJournal.unfinished():
+        entries = AnswerJournal.replay(path)
+        if entries and input(f"Resume interrupted session with {len(entries)} answers? (y/n): ").lower().startswith('y'):
+            journal = AnswerJournal(path)
+            generator.resume_answers = deque(entries)
+            break
+    generator.journal = journal or AnswerJournal.create()
     
-    print(f"\nMandatory documentation generated and saved as {filename}")
+    cache = SectionCache(args.cache_dir) if args.cache_dir else None
+    if args.store:
+        # Imported here as the store splits packs with this module
+        from ContentStore import ContentStore
+        store = ContentStore(args.store)
+        sections = generator.generate_mandatory_documentation(cache, sections=True)
+        with generator._phase('write'):
+            pack, changed = store.put_pack(sections)
+        generator.journal.discard()
+        print(f"\nMandatory documentation stored as {pack[:12]} in {args.store}"
+              f"{'' if changed else ' (unchanged since the last generation)'}")
+    else:
+        documentation = generator.generate_mandatory_documentation(cache)
+
+        # Stream documentation to disk section by section
+        filename = f"ISO27001_Mandatory_Documentation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        with generator._phase('write'):
+            write_documentation(filename, documentation)
+        generator.journal.discard()
+        print(f"\nMandatory documentation generated and saved as {filename}")
+    if cache:
+        removed, _ = cache.prune()
+        print(f"Sections re-rendered: {cache.misses}, reused unchanged: {cache.hits}"
+              + (f", {removed} stale cached sections pruned" if removed else ""))
+    if args.index:
+        # Imported here as the search index parses packs with this module
+        from SearchIndex import SearchIndex
+        index = SearchIndex(args.index)
+        try:
+            index.add_files([filename])
+        finally:
+            index.close()
+        print(f"Added to search index {args.index}")
+    if profiler:
+        profiler.export_json(f"{args.profile}.json")
+        profiler.export_chrome_trace(f"{args.profile}.trace.json")
+        print("\n" + "\n".join(profiler.summary()))
     print("\nNext steps:")
     print("1. Review all mandatory documents")
     print("2. Get management approval")
@@ -0,0 +1,214 @@
+import argparse
+import csv
+import json
+import math
+import operator
+import re
+from collections import deque
+from datetime import datetime, timezone
+
+# Rolling windows are kept as this many time buckets of running totals, so
+# memory per objective is bounded however dense the measurement log is
+WINDOW_BUCKETS = 96
+READ_BUFFER_SIZE = 1024 * 1024
+
+TARGET_PATTERN = re.compile(r'^\s*(>=|<=|>|<|=)?\s*(-?\d+(?:\.\d+)?)\s*%?\s*$')
+COMPARISONS = {'>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt, '=': operator.eq}
+
+MONITORING_COLUMNS = ('Objective ID', 'Target', 'Window', 'Measured', 'Attainment', 'Status')
+
+
+def parse_target(target):
+    """Split a target such as '>= 99.9%' or '100%' into (comparison, value)"""
+    match = TARGET_PATTERN.match(str(target))
+    if not match:
+        raise ValueError(f"Unrecognised objective target: {target!r}")
+    return match.group(1) or '>=', float(match.group(2))
+
+
+def parse_timestamp(value):
+    """Seconds since the epoch from an ISO 8601 timestamp or a number"""
+    try:
+        seconds = float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+    if not math.isfinite(seconds):
+        raise ValueError(f"Timestamp is not a finite number: {value!r}")
+    return seconds
+
+
+class Objective:
+    """One security objective and its rolling-window measurements
+
+    Buckets hold [measurement count, value sum, count meeting the target]
+    for consecutive slices of the window; the oldest bucket is dropped as
+    new ones are opened, and window totals are kept as running sums.
+    """
+
+    def __init__(self, objective_id, metric, target, window_days=30, description="",
+                 frequency="Monthly", responsible="[Role]"):
+        self.objective_id = objective_id
+        self.metric = metric
+        self.target = target
+        self.comparison, self.target_value = parse_target(target)
+        self.meets = COMPARISONS[self.comparison]
+        self.window_days = window_days
+        self.description = description
+        self.frequency = frequency
+        self.responsible = responsible
+        self.bucket_seconds = window_days * 86400 / WINDOW_BUCKETS
+        self.buckets = deque()
+        self.first_bucket = None
+        self.count = 0
+        self.total = 0.0
+        self.met = 0
+        self.dropped = 0
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.bucket_seconds)
+        if self.first_bucket is None:
+            self.first_bucket = bucket
+            self.buckets.append([0, 0.0, 0])
+        last_bucket = self.first_bucket + len(self.buckets) - 1
+        if bucket > last_bucket:
+            if bucket - last_bucket >= WINDOW_BUCKETS:
+                self.buckets.clear()
+                self.count, self.total, self.met = 0, 0.0, 0
+                self.first_bucket = bucket
+                last_bucket = bucket - 1
+            for _ in range(bucket - last_bucket):
+                self.buckets.append([0, 0.0, 0])
+            while len(self.buckets) > WINDOW_BUCKETS:
+                count, total, met = self.buckets.popleft()
+                self.count -= count
+                self.total -= total
+                self.met -= met
+                self.first_bucket += 1
+        elif bucket < self.first_bucket:
+            # Older than the rolling window
+            self.dropped += 1
+            return
+
+        met = 1 if self.meets(value, self.target_value) else 0
+        slot = self.buckets[bucket - self.first_bucket]
+        slot[0] += 1
+        slot[1] += value
+        slot[2] += met
+        self.count += 1
+        self.total += value
+        self.met += met
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def attainment(self):
+        """Share of measurements in the window that met the target"""
+        return self.met / self.count if self.count else None
+
+    @property
+    def status(self):
+        if not self.count:
+            return "No data"
+        return "Achieved" if self.meets(self.mean, self.target_value) else "Not achieved"
+
+
+class ObjectiveMonitor:
+    """Stream measurements into the rolling windows of the defined objectives"""
+
+    def __init__(self, definitions):
+        self.objectives = [Objective(**definition) for definition in definitions]
+        self.by_metric = {}
+        for objective in self.objectives:
+            self.by_metric.setdefault(objective.metric, []).append(objective)
+        self.ingested = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def ingest(self, rows):
+        """Add (timestamp, metric, value) rows; unknown metrics and unreadable rows are skipped"""
+        by_metric = self.by_metric
+        for timestamp, metric, value in rows:
+            objectives = by_metric.get(metric)
+            if not objectives:
+                self.skipped += 1
+                continue
+            try:
+                timestamp = parse_timestamp(timestamp)
+                value = float(value.rstrip('%')) if isinstance(value, str) else float(value)
+            except (TypeError, ValueError):
+                self.skipped += 1
+                continue
+            if not math.isfinite(value):
+                self.skipped += 1
+                continue
+            for objective in objectives:
+                objective.add(timestamp, value)
+            self.ingested += 1
+
+    def ingest_csv(self, path):
+        """Stream a timestamp,metric,value CSV through a large read buffer"""
+        with open(path, newline='', encoding='utf-8-sig', buffering=READ_BUFFER_SIZE) as f:
+            reader = csv.reader(f)
+            header = [name.strip().lower() for name in next(reader, [])]
+            try:
+                positions = [header.index(name) for name in ('timestamp', 'metric', 'value')]
+            except ValueError:
+                raise ValueError(f"Measurement log {path} needs timestamp, metric and value columns") from None
+            width = max(positions) + 1
+            cells = operator.itemgetter(*positions)
+            # Short rows have no metric and are counted as skipped
+            self.ingest(cells(row) if len(row) >= width else (None, None, None) for row in reader if row)
+
+    def monitoring_records(self):
+        """Yield Monitoring and Reporting cells (ID, frequency, responsible, status)"""
+        for objective in self.objectives:
+            yield objective.objective_id, objective.frequency, objective.responsible, objective.status
+
+    def definition_records(self):
+        """Yield Objective Definition cells (ID, description, target, measurement)"""
+        for objective in self.objectives:
+            yield (objective.objective_id, objective.description, objective.target,
+                   f"{objective.metric}, {objective.window_days}-day rolling window")
+
+    def rows(self):
+        """Yield attainment table lines for the generated pack"""
+        yield "| " + " | ".join(f"{title:<12}" for title in MONITORING_COLUMNS) + " |"
+        yield "|" + "|".join("-" * 14 for _ in MONITORING_COLUMNS) + "|"
+        for objective in self.objectives:
+            measured = f"{objective.mean:.2f}" if objective.count else "-"
+            attainment = f"{objective.attainment:.1%}" if objective.count else "-"
+            cells = (objective.objective_id, f"{objective.comparison} {objective.target_value:g}",
+                     f"{objective.window_days} days", measured, attainment, objective.status)
+            yield "| " + " | ".join(f"{cell:<12}" for cell in cells) + " |"
+
+    def template_values(self):
+        """base_template values fed by the measurements"""
+        return {'objective_measurements': "\n".join(self.rows())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-window attainment of security objectives")
+    parser.add_argument('objectives', help="JSON list of objectives (objective_id, metric, target, window_days, ...)")
+    parser.add_argument('measurements', nargs='+', help="CSV logs with timestamp, metric, value columns")
+    args = parser.parse_args()
+
+    monitor = ObjectiveMonitor.from_json(args.objectives)
+    for path in args.measurements:
+        monitor.ingest_csv(path)
+    print(f"Ingested {monitor.ingested:,} measurements "
+          f"({monitor.skipped:,} skipped: other metrics or unreadable rows)")
+    for line in monitor.rows():
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class PhaseProfiler:
+    """Opt-in wall, CPU and memory timings for generation phases and sections
+
+    Phases nest; memory peaks of nested phases are folded into their parents
+    so tracemalloc.reset_peak() in a child does not hide the parent's peak.
+    Events export as a JSON summary or as a Chrome trace (chrome://tracing,
+    Perfetto).
+    """
+
+    def __init__(self, memory=True, label=None):
+        self.memory = memory
+        self.label = label
+        self.events = []
+        self._stack = []
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _begin(self):
+        frame = {'peak': 0, 'memory': 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['memory'] = current
+        frame['wall'] = time.perf_counter_ns()
+        frame['cpu'] = time.process_time_ns()
+        self._stack.append(frame)
+        return frame
+
+    def _end(self, frame, name, category, args):
+        wall = time.perf_counter_ns() - frame['wall']
+        cpu = time.process_time_ns() - frame['cpu']
+        self._stack.pop()
+        event = {
+            'name': name,
+            'category': category,
+            # perf_counter is system-wide monotonic, so events recorded in
+            # different worker processes line up on one trace timeline
+            'start_us': frame['wall'] / 1000,
+            'wall_ms': wall / 1e6,
+            'cpu_ms': cpu / 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame['peak'])
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            event['memory_delta_kb'] = (current - frame['memory']) / 1024
+            event['memory_peak_kb'] = (peak - frame['memory']) / 1024
+        if self.label:
+            event['label'] = self.label
+        event.update(args)
+        self.events.append(event)
+
+    @contextmanager
+    def phase(self, name, category='phase', **args):
+        frame = self._begin()
+        try:
+            yield
+        finally:
+            self._end(frame, name, category, args)
+
+    def profile_iter(self, name, chunks, category='section', **args):
+        """Wrap a lazily rendered iterable, timing it from first to last chunk"""
+        frame = self._begin()
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            self._end(frame, name, category, dict(args, characters=size))
+
+    def summary(self):
+        """Lines of the recorded events, slowest first"""
+        lines = [f"{'Phase':<36} {'Wall ms':>10} {'CPU ms':>10} {'Peak KB':>10}"]
+        for event in sorted(self.events, key=lambda e: e['wall_ms'], reverse=True):
+            lines.append(f"{event['category'] + ':' + event['name']:<36} {event['wall_ms']:>10.2f} "
+                         f"{event['cpu_ms']:>10.2f} {event.get('memory_peak_kb', 0):>10.1f}")
+        return lines
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'events': self.events}, f, indent=2)
+
+    def export_chrome_trace(self, path):
+        write_chrome_trace(path, self.events)
+
+
+def write_chrome_trace(path, events):
+    """Write events, possibly from several processes, in Chrome trace format"""
+    trace_events = []
+    for event in events:
+        args = {key: value for key, value in event.items()
+                if key not in ('name', 'category', 'start_us', 'wall_ms', 'pid', 'tid')}
+        trace_events.append({
+            'name': event['name'],
+            'cat': event['category'],
+            'ph': 'X',
+            'ts': event['start_us'],
+            'dur': event['wall_ms'] * 1000,
+            'pid': event['pid'],
+            'tid': event['tid'],
+            'args': args,
+        })
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
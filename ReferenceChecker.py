@@ -0,0 +1,216 @@
+import argparse
+import os
+import re
+import sys
+import zipfile
+
+# Document types of DocTemplates.py and the consolidated pack; tokens of
+# other types only count as references if the corpus has such a document
+DOCUMENT_TYPES = frozenset(('CTX', 'IPA', 'SCOPE', 'LCD', 'ISP', 'RA', 'OBJ', 'SOA', 'ISMS'))
+# Documents nothing is expected to reference
+ROOT_TYPES = ('ISMS',)
+
+# IDs as made by DocIdAllocator.format_id, optionally pinned to a version,
+# e.g. "RA-26-07", "RA-26-07 v1.2" or "SOA-26-01 (Version 2.0)". Scanning
+# starts at the literal "-YY-NN" part, which the regex engine finds far
+# faster than a leading word boundary, and looks back for the type
+ID_SUFFIX_PATTERN = re.compile(r'(-\d{2}-\d{2,})\b(?:\s*\(?(?i:v|version)\s*(\d+(?:\.\d+)*)\)?)?')
+ID_TYPE_PATTERN = re.compile(r'(?<![A-Za-z0-9])[A-Z][A-Z0-9]{1,7}\Z')
+MAX_TYPE_LENGTH = 8
+HEADER_LINES = 12
+TEXT_SUFFIXES = ('.txt', '.md')
+
+
+def version_key(version):
+    """Sortable form of a version string such as '1.10'"""
+    return tuple(int(part) for part in re.findall(r'\d+', version or '')) or (0,)
+
+
+class Document:
+    __slots__ = ('doc_id', 'version', 'supersedes', 'source', 'references')
+
+    def __init__(self, doc_id, version, supersedes, source, references):
+        self.doc_id = doc_id
+        self.version = version
+        self.supersedes = supersedes
+        self.source = source
+        # (target doc_id, pinned version or None, line number)
+        self.references = references
+
+
+def iter_references(text):
+    """Yield (doc_id, pinned version or None, offset) of every document ID in text"""
+    for match in ID_SUFFIX_PATTERN.finditer(text):
+        start = match.start()
+        doc_type = ID_TYPE_PATTERN.search(text, max(0, start - MAX_TYPE_LENGTH), start)
+        if doc_type:
+            yield doc_type.group() + match.group(1), match.group(2), doc_type.start()
+
+
+def parse_document(text, source):
+    """Header fields and outgoing references of one document, in one pass over its text"""
+    header = {}
+    for line in text.lstrip().split('\n', HEADER_LINES)[:HEADER_LINES]:
+        label, colon, value = line.partition(':')
+        if colon and label.strip() in ('Document ID', 'Version', 'Supersedes'):
+            header[label.strip()] = value.strip()
+    doc_id = header.get('Document ID')
+    supersedes = [target for target, _, _ in iter_references(header.get('Supersedes', ''))]
+
+    references = []
+    line_no = 1
+    position = 0
+    for target, version, offset in iter_references(text):
+        if target == doc_id or target in supersedes:
+            continue
+        # Count newlines incrementally so line numbers stay linear in the text size
+        line_no += text.count('\n', position, offset)
+        position = offset
+        references.append((target, version, line_no))
+    return Document(doc_id, header.get('Version'), supersedes, source, references)
+
+
+def iter_sources(paths):
+    """Yield (source, text) for document files, directories of them and zip bundles"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, directories, files in os.walk(path):
+                directories.sort()
+                for name in sorted(files):
+                    if name.endswith(TEXT_SUFFIXES):
+                        yield from iter_sources([os.path.join(root, name)])
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for name in archive.namelist():
+                    if name.endswith(TEXT_SUFFIXES):
+                        yield f"{path}:{name}", archive.read(name).decode('utf-8')
+        else:
+            with open(path, encoding='utf-8') as f:
+                yield path, f.read()
+
+
+class ReferenceGraph:
+    """Document reference graph and its integrity problems
+
+    Every document is parsed once into its header and outgoing references;
+    the graph is then a dict of current documents by ID plus inbound
+    reference counts, so all checks are linear in the number of documents
+    and references. A document is superseded when a later version with the
+    same ID exists, or when another document names it in a Supersedes
+    header; references to it, or references pinned to a version other than
+    the current one, are stale.
+    """
+
+    def __init__(self, root_types=ROOT_TYPES):
+        self.root_types = frozenset(root_types)
+        self.documents = []
+        self.current = {}
+        self.duplicates = []
+        self.untitled = []
+
+    def add(self, text, source):
+        document = parse_document(text, source)
+        self.documents.append(document)
+        if not document.doc_id:
+            self.untitled.append(document)
+            return document
+        existing = self.current.get(document.doc_id)
+        if existing is None:
+            self.current[document.doc_id] = document
+        else:
+            order = version_key(document.version), version_key(existing.version)
+            if order[0] == order[1]:
+                self.duplicates.append((document, existing))
+            elif order[0] > order[1]:
+                self.current[document.doc_id] = document
+        return document
+
+    def add_sources(self, paths):
+        for source, text in iter_sources(paths):
+            self.add(text, source)
+        return self
+
+    @property
+    def reference_count(self):
+        return sum(len(document.references) for document in self.documents)
+
+    def issues(self):
+        """Yield (severity, kind, source, line, message), errors before warnings"""
+        replaced_by = {}
+        for document in self.current.values():
+            for old_id in document.supersedes:
+                replaced_by[old_id] = document.doc_id
+        known_types = DOCUMENT_TYPES | {doc_id.rsplit('-', 2)[0] for doc_id in self.current}
+
+        inbound = dict.fromkeys(self.current, 0)
+        warnings = []
+        for document in self.untitled:
+            warnings.append(('WARNING', 'untitled', document.source, 1, "No Document ID in the header"))
+        # Packs of separate organizations may share an ID unless IDs come from one allocator
+        for document, existing in self.duplicates:
+            warnings.append(('WARNING', 'duplicate', document.source, 1,
+                             f"{document.doc_id} version {document.version} is also {existing.source}"))
+
+        for document in self.documents:
+            if document.doc_id and self.current.get(document.doc_id) is not document:
+                # References of superseded versions no longer count
+                continue
+            for target, version, line in document.references:
+                if target.rsplit('-', 2)[0] not in known_types:
+                    continue
+                current = self.current.get(target)
+                if target in replaced_by:
+                    yield ('ERROR', 'stale', document.source, line,
+                           f"{target} is superseded by {replaced_by[target]}")
+                elif current is None:
+                    yield 'ERROR', 'dangling', document.source, line, f"{target} does not exist"
+                elif version and version_key(version) != version_key(current.version):
+                    yield ('ERROR', 'stale', document.source, line,
+                           f"{target} version {version} is superseded by version {current.version}")
+                if current is not None and target != document.doc_id:
+                    inbound[target] += 1
+
+        for doc_id, document in self.current.items():
+            if not inbound[doc_id] and doc_id not in replaced_by \
+                    and doc_id.rsplit('-', 2)[0] not in self.root_types:
+                warnings.append(('WARNING', 'orphan', document.source, 1,
+                                 f"{doc_id} is not referenced by any other document"))
+        yield from warnings
+
+
+def check_references(paths, root_types=ROOT_TYPES, strict=False, output=sys.stdout):
+    """Print reference problems of the documents under paths; returns the error count
+
+    With strict, warnings such as orphaned documents count as errors.
+    """
+    graph = ReferenceGraph(root_types).add_sources(paths)
+    errors = warnings = 0
+    for severity, kind, source, line, message in graph.issues():
+        if strict:
+            severity = 'ERROR'
+        if severity == 'ERROR':
+            errors += 1
+        else:
+            warnings += 1
+        print(f"{source}:{line}: {severity} {kind}: {message}", file=output)
+    print(f"Checked {len(graph.documents):,} documents and {graph.reference_count:,} references: "
+          f"{errors} errors, {warnings} warnings", file=output)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check cross-document references for dangling, orphaned and superseded targets"
+    )
+    parser.add_argument('paths', nargs='+', help="Generated documents, directories of them or zip bundles")
+    parser.add_argument('--root', action='append', metavar='TYPE',
+                        help=f"Document type nothing needs to reference (default: {', '.join(ROOT_TYPES)})")
+    parser.add_argument('--strict', action='store_true', help="Treat orphaned documents as errors")
+    args = parser.parse_args()
+
+    errors = check_references(args.paths, args.root or ROOT_TYPES, args.strict)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import re
+from bisect import bisect_right, insort
+from datetime import date, datetime, timedelta
+from itertools import count
+
+from DocumentCatalog import DEFAULT_DATABASE, DocumentCatalog
+from ISO27001DocsGenerator import parse_documentation
+
+DEFAULT_FREQUENCY_DAYS = 365
+
+# Review frequencies as written in the templates and their length in days
+NAMED_FREQUENCIES = {
+    'weekly': 7,
+    'monthly': 30,
+    'quarterly': 91,
+    'semi-annual': 182,
+    'semi-annually': 182,
+    'biannual': 182,
+    'twice yearly': 182,
+    'annual': 365,
+    'annually': 365,
+    'yearly': 365,
+    'biennial': 730,
+}
+UNIT_DAYS = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+FREQUENCY_PATTERN = re.compile(r'^(?:every\s+)?(\d+)\s*(day|week|month|year)s?$')
+
+
+def frequency_days(frequency):
+    """Length in days of a review frequency such as 'Quarterly' or '6 months'"""
+    if not frequency:
+        return DEFAULT_FREQUENCY_DAYS
+    text = frequency.strip().lower()
+    if text in NAMED_FREQUENCIES:
+        return NAMED_FREQUENCIES[text]
+    match = FREQUENCY_PATTERN.match(text)
+    if match:
+        return int(match.group(1)) * UNIT_DAYS[match.group(2)]
+    return DEFAULT_FREQUENCY_DAYS
+
+
+def parse_date(value):
+    """Date of a YYYY-MM-DD header value, or None if it is missing or unreadable"""
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').date()
+    except (AttributeError, ValueError):
+        return None
+
+
+class ReviewItem:
+    """A document and when its next review is due; None for unscheduled documents"""
+    __slots__ = ('key', 'doc_id', 'title', 'owner', 'last_review', 'frequency_days', 'next_review')
+
+    def __init__(self, key, doc_id, title, owner, last_review, frequency_days):
+        self.key = key
+        self.doc_id = doc_id
+        self.title = title
+        self.owner = owner
+        self.last_review = last_review
+        self.frequency_days = frequency_days
+        self.next_review = last_review + timedelta(days=frequency_days) if last_review else None
+
+
+class ReviewScheduler:
+    """Review due dates kept in a sorted index
+
+    The index holds (due date ordinal, sequence, key) tuples in order, so
+    "due within N days" is a bisect plus a slice of the matching entries
+    rather than a scan over every document. Documents without a valid
+    last review date are kept out of the index as unscheduled and head the
+    calendar, since their review cannot be shown to be current.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self._index = []
+        self._entries = {}
+        self._sequence = count()
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, key, doc_id, title, owner, last_review, frequency_days=DEFAULT_FREQUENCY_DAYS):
+        """Schedule a document; re-adding a key reschedules it"""
+        if key in self.items:
+            self._unindex(key)
+        item = ReviewItem(key, doc_id, title, owner, last_review, frequency_days)
+        self.items[key] = item
+        if item.next_review is None:
+            return item
+        entry = (item.next_review.toordinal(), next(self._sequence), key)
+        self._entries[key] = entry
+        insort(self._index, entry)
+        return item
+
+    def _unindex(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        position = bisect_right(self._index, entry) - 1
+        del self._index[position]
+
+    def record_review(self, key, reviewed_on=None):
+        """Mark a document as reviewed and schedule its next review"""
+        item = self.items[key]
+        return self.add(key, item.doc_id, item.title, item.owner,
+                        reviewed_on or date.today(), item.frequency_days)
+
+    def due_within(self, days, today=None):
+        """Items due on or before today + days, overdue first"""
+        limit = ((today or date.today()) + timedelta(days=days)).toordinal()
+        end = bisect_right(self._index, (limit, float('inf')))
+        return [self.items[key] for _, _, key in self._index[:end]]
+
+    def next_due(self, limit=10):
+        return [self.items[key] for _, _, key in self._index[:limit]]
+
+    def unscheduled(self):
+        """Items without a valid last review date"""
+        return [item for key, item in self.items.items() if key not in self._entries]
+
+    def calendar(self, days, today=None):
+        """Yield a consolidated review calendar grouped by month"""
+        today = today or date.today()
+        unscheduled = self.unscheduled()
+        if unscheduled:
+            yield "\nUNSCHEDULED (no valid last review date)\n---------------------------------------"
+            for item in unscheduled:
+                yield (f"{'[No date]':<10}  {item.doc_id or '[No ID]'}  {item.title or ''}  "
+                       f"(owner: {item.owner or '[Unassigned]'})")
+        month = None
+        for item in self.due_within(days, today):
+            heading = item.next_review.strftime('%Y-%m')
+            if heading != month:
+                month = heading
+                yield f"\n{heading}\n{'-' * len(heading)}"
+            status = "OVERDUE " if item.next_review < today else ""
+            yield (f"{item.next_review.isoformat()}  {status}{item.doc_id or '[No ID]'}  "
+                   f"{item.title or ''}  (owner: {item.owner or '[Unassigned]'})")
+
+    def add_header(self, key, header):
+        """Schedule a document from the header fields of a generated pack"""
+        return self.add(
+            key,
+            header.get('doc_id'),
+            header.get('doc_title'),
+            header.get('owner'),
+            parse_date(header.get('date')),
+            frequency_days(header.get('review_frequency')),
+        )
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        scheduler = cls()
+        for row in catalog.find():
+            scheduler.add_header(row['path'], dict(row))
+        return scheduler
+
+    @classmethod
+    def from_files(cls, paths):
+        scheduler = cls()
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                header, _ = parse_documentation(f.read())
+            scheduler.add_header(path, header)
+        return scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List document reviews due in the next N days")
+    parser.add_argument('paths', nargs='*', help="Generated packs (default: every document in the catalog)")
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help="Document catalog to read")
+    parser.add_argument('--days', type=int, default=90, help="Look-ahead window in days")
+    args = parser.parse_args()
+
+    if args.paths:
+        scheduler = ReviewScheduler.from_files(args.paths)
+    else:
+        catalog = DocumentCatalog(args.database)
+        try:
+            scheduler = ReviewScheduler.from_catalog(catalog)
+        finally:
+            catalog.close()
+
+    due = scheduler.due_within(args.days)
+    unscheduled = len(scheduler.unscheduled())
+    print(f"REVIEW CALENDAR: {len(due)} of {len(scheduler)} documents due in the next {args.days} days"
+          + (f", {unscheduled} without a review date" if unscheduled else ""))
+    for line in scheduler.calendar(args.days):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
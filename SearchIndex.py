@@ -0,0 +1,147 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+
+from DocDiff import header_fields, split_clauses
+
+DEFAULT_INDEX = 'iso27001_search.db'
+
+# Clause passages are indexed by an FTS5 table, SQLite's persistent
+# inverted index; passages maps each indexed row back to its document so a
+# re-indexed document replaces its old postings
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    doc_id TEXT,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    section TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS passages_document_id ON passages(document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS passage_text USING fts5(title, body, tokenize='porter unicode61');
+"""
+
+TERM = re.compile(r'\w+')
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query matching every word (prefix on the last)"""
+    terms = TERM.findall(query)
+    if not terms:
+        raise ValueError("Search query has no words")
+    return " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+
+
+class SearchIndex:
+    """Persistent full-text index of generated packs at clause granularity"""
+
+    def __init__(self, path=DEFAULT_INDEX):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _remove(self, document_id):
+        self.connection.execute(
+            "DELETE FROM passage_text WHERE rowid IN (SELECT id FROM passages WHERE document_id = ?)",
+            (document_id,),
+        )
+        self.connection.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+
+    def add_text(self, path, text, mtime=None):
+        """Index (or re-index) one pack's clauses"""
+        path = os.path.abspath(path)
+        clauses = split_clauses(text)
+        doc_id = header_fields(clauses[0][2]).get('Document ID')
+        row = self.connection.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+        if row:
+            self._remove(row['id'])
+        document_id = self.connection.execute(
+            "INSERT INTO documents (path, doc_id, mtime) VALUES (?, ?, ?)",
+            (path, doc_id, mtime if mtime is not None else time.time()),
+        ).lastrowid
+        for section, title, lines in clauses:
+            passage_id = self.connection.execute(
+                "INSERT INTO passages (document_id, section) VALUES (?, ?)", (document_id, section)
+            ).lastrowid
+            self.connection.execute(
+                "INSERT INTO passage_text (rowid, title, body) VALUES (?, ?, ?)",
+                (passage_id, title, "".join(lines)),
+            )
+
+    def add_files(self, paths):
+        """Index packs that are new or changed since they were last indexed"""
+        count = 0
+        with self.connection:
+            for path in paths:
+                mtime = os.path.getmtime(path)
+                row = self.connection.execute(
+                    "SELECT mtime FROM documents WHERE path = ?", (os.path.abspath(path),)
+                ).fetchone()
+                if row and row['mtime'] == mtime:
+                    continue
+                with open(path, encoding='utf-8') as f:
+                    self.add_text(path, f.read(), mtime)
+                count += 1
+        return count
+
+    def search(self, query, limit=20, raw=False):
+        """Best matching clauses as rows of doc_id, path, section, title, snippet"""
+        expression = query if raw else match_expression(query)
+        return self.connection.execute(
+            """
+            SELECT documents.doc_id, documents.path, passages.section, passage_text.title,
+                   snippet(passage_text, 1, '[', ']', ' ... ', 16) AS snippet
+            FROM passage_text
+            JOIN passages ON passages.id = passage_text.rowid
+            JOIN documents ON documents.id = passages.document_id
+            WHERE passage_text MATCH ?
+            ORDER BY bm25(passage_text)
+            LIMIT ?
+            """,
+            (expression, limit),
+        ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over generated ISO 27001 documents")
+    parser.add_argument('--index', default=DEFAULT_INDEX, help="Search index database")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="Index generated documentation packs")
+    add.add_argument('paths', nargs='+')
+
+    search = commands.add_parser('search', help="Find clauses mentioning all the given words")
+    search.add_argument('query')
+    search.add_argument('-n', '--limit', type=int, default=20)
+    search.add_argument('--raw', action='store_true', help="Pass the query as an FTS5 expression")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index)
+    try:
+        if args.command == 'add':
+            print(f"Indexed {index.add_files(args.paths)} documents in {args.index}")
+        else:
+            start = time.perf_counter()
+            rows = index.search(args.query, args.limit, args.raw)
+            for row in rows:
+                snippet = " ".join(row['snippet'].split())
+                print(f"{row['doc_id'] or '[No ID]':<14} {row['section']:<8} {snippet}\n{'':<23}{row['path']}")
+            print(f"{len(rows)} matches in {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+READ_BLOCK_SIZE = 64 * 1024
+DEFAULT_CACHE_DIR = '.iso27001_cache'
+# Bounds prune() keeps an on-disk cache within
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+MAX_CACHE_AGE_DAYS = 90
+
+
+class StreamedText:
+    """Re-iterable placeholder value streamed from a chunk factory
+
+    The fingerprint identifies the inputs the text is rendered from, so a
+    section holding streamed text can be cached without rendering it first.
+    """
+
+    def __init__(self, chunks, fingerprint):
+        self.chunks = chunks
+        self.fingerprint = fingerprint
+
+    def __iter__(self):
+        return iter(self.chunks())
+
+
+def section_key(section, plan, values):
+    """Hash the template text and placeholder inputs of one section
+
+    Returns None when an input is streamed without a fingerprint, in which
+    case the section cannot be cached and is always rendered.
+    """
+    digest = hashlib.sha256(section.encode('utf-8') + b'\0')
+    for part in plan.parts:
+        if part is not None:
+            digest.update(part.encode('utf-8'))
+    for name in plan.placeholders:
+        value = values[name]
+        if isinstance(value, str):
+            fingerprint = value
+        elif hasattr(value, '__iter__'):
+            fingerprint = getattr(value, 'fingerprint', None)
+            if fingerprint is None:
+                return None
+        else:
+            fingerprint = str(value)
+        encoded = fingerprint.encode('utf-8')
+        digest.update(f"\0{name}:{len(encoded)}:".encode('utf-8') + encoded)
+    return digest.hexdigest()
+
+
+class SectionCache:
+    """On-disk cache of rendered sections keyed by the hash of their inputs
+
+    A hit touches the cached file, so its modification time is its last
+    use and prune() can drop the least recently used sections.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def render(self, section, plan, values):
+        """Yield a section from the cache, rendering and storing it on a miss"""
+        key = section_key(section, plan, values)
+        if key is None:
+            self.misses += 1
+            yield from plan.iter_render(values)
+            return
+
+        path = self._path(key)
+        try:
+            f = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            with f:
+                os.utime(f.fileno())
+                while True:
+                    block = f.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    yield block
+            return
+
+        self.misses += 1
+        yield from self._store(path, plan.iter_render(values))
+
+    def _store(self, path, chunks):
+        # Write through a temporary file so a partial render is never cached
+        # and concurrent workers storing the same section do not collide
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def prune(self, max_bytes=MAX_CACHE_BYTES, max_age_days=MAX_CACHE_AGE_DAYS):
+        """Remove sections unused for max_age_days, then the least recently
+        used ones until the cache fits in max_bytes; returns (removed, bytes)"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.txt'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(reverse=True)
+        cutoff = time.time() - max_age_days * 86400
+        kept = removed = freed = 0
+        for mtime, size, path in entries:
+            if mtime >= cutoff and kept + size <= max_bytes:
+                kept += size
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+
+class MemorySectionCache:
+    """In-process LRU cache of rendered sections keyed like SectionCache
+
+    Lets packs rendered in the same process, such as subsidiaries layered
+    on one parent answer set, reuse sections whose inputs resolve equal.
+    The cache is bounded in characters rather than entries. Sections with
+    streamed inputs or larger than max_section_chars are streamed through
+    uncached, so large registers never accumulate in memory.
+    """
+
+    def __init__(self, max_chars=16 * 1024 * 1024, max_section_chars=1024 * 1024):
+        self.max_chars = max_chars
+        self.max_section_chars = max_section_chars
+        self.sections = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, section, plan, values):
+        key = section_key(section, plan, values)
+        if key is None or any(isinstance(values[name], StreamedText) for name in plan.placeholders):
+            self.misses += 1
+            yield from plan.iter_render(values)
+            return
+
+        text = self.sections.get(key)
+        if text is not None:
+            self.hits += 1
+            self.sections.move_to_end(key)
+            yield text
+            return
+
+        self.misses += 1
+        chunks = []
+        size = 0
+        for chunk in plan.iter_render(values):
+            yield chunk
+            if chunks is not None:
+                size += len(chunk)
+                if size > self.max_section_chars:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+        if chunks is None:
+            return
+        self.sections[key] = "".join(chunks)
+        self.size += size
+        while self.size > self.max_chars:
+            _, evicted = self.sections.popitem(last=False)
+            self.size -= len(evicted)
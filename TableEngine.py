@@ -0,0 +1,254 @@
+import argparse
+import csv
+import os
+import re
+import sys
+from functools import lru_cache
+
+# DocTemplates.py is a markdown catalogue of the audit-ready templates, not
+# an importable module, so it is read and parsed as text
+DOC_TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DocTemplates.py')
+
+SEPARATOR_ROW = re.compile(r'^\|(\s*-+\s*\|)+\s*$')
+SECTION_HEADING = re.compile(r'^\d+(?:\.\d+)*\.?\s+(.+)$')
+DOCUMENT_ID = re.compile(r'^Document ID:\s*([A-Z]+)-')
+
+
+def column_key(title):
+    """Normalise a column title to a record key, e.g. 'Applicable?' -> 'applicable'"""
+    return re.sub(r'[^a-z0-9]+', '_', title.lower()).strip('_')
+
+
+def _split_row(line):
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+class TableSchema:
+    """Columns and declared widths of one markdown table in a template"""
+
+    def __init__(self, name, header, separator, rows):
+        self.name = name
+        self.columns = _split_row(header)
+        self.keys = [column_key(title) for title in self.columns]
+        self.widths = [
+            max(len(segment) - 2, len(title), 1)
+            for segment, title in zip(separator.strip().strip('|').split('|'), self.columns)
+        ]
+        self.placeholder_rows = [tuple(_split_row(row)) for row in rows]
+
+    def _row_format(self, widths):
+        return "| " + " | ".join(f"{{:<{width}}}" for width in widths) + " |\n"
+
+    def _extract(self, records):
+        """Yield records as string cell tuples in schema column order
+
+        Dict records may omit columns, which are left blank, and cells of
+        any type are converted with str(), e.g. numbers from JSON answers.
+        """
+        width = len(self.columns)
+        pairs = list(zip(self.columns, self.keys))
+        for record in records:
+            if isinstance(record, dict):
+                cells = [record[title] if title in record else record.get(key, "") for title, key in pairs]
+            else:
+                if len(record) == width:
+                    try:
+                        # str.join checks every cell is a string at C speed, so
+                        # CSV and register rows pass through unconverted
+                        "".join(record)
+                        yield record
+                        continue
+                    except TypeError:
+                        pass
+                cells = list(record)
+                if len(cells) < width:
+                    cells.extend([""] * (width - len(cells)))
+            yield tuple("" if cell is None else cell if isinstance(cell, str) else str(cell) for cell in cells)
+
+    def fit_widths(self, records):
+        """Widen the declared widths to fit records in one streaming pass"""
+        widths = list(self.widths)
+        indexes = range(len(widths))
+        for cells in self._extract(records):
+            for index in indexes:
+                length = len(cells[index])
+                if length > widths[index]:
+                    widths[index] = length
+        return widths
+
+    def render(self, records=None):
+        """Yield the table lines, filled from records or the template placeholders
+
+        Records are dicts keyed by column title or column_key, or sequences
+        in column order. Re-iterable sources (lists, CsvRecords) get a width
+        pass before rows are emitted; one-shot iterators are emitted lazily
+        at the declared template widths. Each row is produced by a single
+        precompiled format call.
+        """
+        if records is None:
+            records = self.placeholder_rows
+        if iter(records) is records:
+            widths = self.widths
+        else:
+            widths = self.fit_widths(records)
+
+        row_format = self._row_format(widths).format
+        yield row_format(*self.columns)
+        yield "|" + "|".join("-" * (width + 2) for width in widths) + "|\n"
+        for cells in self._extract(records):
+            yield row_format(*cells)
+
+    def csv_records(self, path):
+        return CsvRecords(path, self)
+
+
+class CsvRecords:
+    """Re-iterable CSV source yielding rows ordered by a table's columns
+
+    The CSV header is matched to the schema by column title or column_key;
+    columns missing from the CSV are left blank.
+    """
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+
+    def __iter__(self):
+        with open(self.path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = [column_key(title) for title in next(reader, [])]
+            positions = [header.index(key) if key in header else None for key in self.schema.keys]
+            width = len(header)
+            for row in reader:
+                if len(row) < width:
+                    row.extend([""] * (width - len(row)))
+                yield tuple(row[position] if position is not None else "" for position in positions)
+
+
+class DocumentTemplate:
+    """A template from DocTemplates.py split into text lines and table schemas"""
+
+    def __init__(self, key, heading, title, parts):
+        self.key = key
+        self.heading = heading
+        self.title = title
+        self.parts = parts
+        self.tables = {part.name: part for part in parts if isinstance(part, TableSchema)}
+
+    def render(self, tables=None, fields=None):
+        """Yield the document text with tables filled from record sources
+
+        tables maps table names (e.g. 'INTERNAL ISSUES') to records;
+        fields replaces 'Label: value' header lines such as 'Document ID'.
+        """
+        tables = tables or {}
+        fields = fields or {}
+        for part in self.parts:
+            if isinstance(part, TableSchema):
+                yield from part.render(tables.get(part.name))
+                continue
+            label, colon, _ = part.partition(':')
+            if colon and label in fields:
+                yield f"{label}: {fields[label]}\n"
+            else:
+                yield part + "\n"
+
+
+def parse_templates(text):
+    """Parse the markdown templates into DocumentTemplates keyed by document ID prefix"""
+    templates = {}
+    lines = text.splitlines()
+    heading = None
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if line.startswith('### '):
+            heading = line[4:].strip()
+        elif line.strip() == '```markdown':
+            block = []
+            index += 1
+            while index < len(lines) and lines[index].strip() != '```':
+                block.append(lines[index])
+                index += 1
+            template = _parse_block(heading, block)
+            templates[template.key] = template
+        index += 1
+    return templates
+
+
+def _parse_block(heading, block):
+    parts = []
+    key = None
+    section = None
+    index = 0
+    while index < len(block):
+        line = block[index]
+        match = DOCUMENT_ID.match(line)
+        if match and key is None:
+            key = match.group(1)
+        match = SECTION_HEADING.match(line)
+        if match:
+            section = match.group(1).strip()
+
+        is_table = (
+            line.startswith('|') and index + 1 < len(block)
+            and SEPARATOR_ROW.match(block[index + 1])
+        )
+        if not is_table:
+            parts.append(line)
+            index += 1
+            continue
+
+        header, separator = line, block[index + 1]
+        index += 2
+        rows = []
+        while index < len(block) and block[index].startswith('|'):
+            rows.append(block[index])
+            index += 1
+        name = section or f"TABLE {len(parts)}"
+        parts.append(TableSchema(name, header, separator, rows))
+
+    title = next((line.strip() for line in block if line.strip()), heading)
+    return DocumentTemplate(key or column_key(heading).upper(), heading, title, parts)
+
+
+@lru_cache(maxsize=None)
+def load_templates(path=DOC_TEMPLATES_PATH):
+    """Parse DocTemplates.py once per process"""
+    with open(path, encoding='utf-8') as f:
+        return parse_templates(f.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill DocTemplates.py tables from CSV files")
+    parser.add_argument('template', nargs='?', help="Template key, e.g. CTX, RA or SOA")
+    parser.add_argument('--table', action='append', default=[], metavar='NAME=CSV',
+                        help="Fill the named table from a CSV file (repeatable)")
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    templates = load_templates()
+    if not args.template:
+        for key, template in templates.items():
+            print(f"{key:<6} {template.heading}")
+            for name in template.tables:
+                print(f"       - {name}")
+        return
+
+    template = templates[args.template.upper()]
+    tables = {}
+    for assignment in args.table:
+        name, _, path = assignment.partition('=')
+        tables[name] = template.tables[name].csv_records(path)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for chunk in template.render(tables):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()